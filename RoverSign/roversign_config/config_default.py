@@ -63,6 +63,34 @@ CONFIG_DEFAULT: Dict[str, GSC] = {
         "自动签到并发数量间隔，默认3-5秒",
         ["3", "5"],
     ),
+    "SignDeadline": GsIntConfig(
+        "自动签到截止时长（分钟）",
+        "自动签到开始后超过该时长不再执行剩余任务，优先保证游戏签到，0为不限制",
+        0,
+        max_value=1440,
+    ),
+    "SignAsyncReply": GsBoolConfig(
+        "签到指令异步回复",
+        "开启后签到指令立即回复当前签到状态，签到在后台执行，完成后推送结果",
+        False,
+    ),
+    "SignLeaseBackend": GsStrConfig(
+        "签到防重方式",
+        "同一账号同时只执行一次签到；memory为进程内，database为数据库租约（多进程部署时使用）",
+        "memory",
+        options=["memory", "database"],
+    ),
+    "SignCommandCooldown": GsIntConfig(
+        "签到指令冷却（秒）",
+        "同一用户在冷却时间内重复签到直接返回上次结果，0为不限制",
+        30,
+        max_value=600,
+    ),
+    "ClearSignRecordTime": GsListStrConfig(
+        "签到记录清理时间（重启生效）",
+        "每日汇总并清理2天前签到记录的时间（时，分），建议设置在空闲时段（重启生效）",
+        ["0", "5"],
+    ),
     "PrivateSignReport": GsBoolConfig(
         "签到私聊报告",
         "关闭后将不再给任何人推送当天签到任务完成情况",
@@ -78,6 +106,24 @@ CONFIG_DEFAULT: Dict[str, GSC] = {
         "签到以图片形式报告",
         False,
     ),
+    "GroupSignReportPicFormat": GsStrConfig(
+        "签到图片报告格式",
+        "png为原图，png8为256色PNG，webp/jpeg按质量有损压缩",
+        "png",
+        options=["png", "png8", "webp", "jpeg"],
+    ),
+    "GroupSignReportPicQuality": GsIntConfig(
+        "签到图片报告质量",
+        "webp/jpeg 格式的压缩质量",
+        85,
+        max_value=100,
+    ),
+    "GroupSignReportPicMaxBytes": GsIntConfig(
+        "签到图片报告大小上限",
+        "图片编码后超过该字节数时改为发送文字报告，0为不限制",
+        0,
+        max_value=1048576,
+    ),
     "KuroUrlProxyUrl": GsStrConfig(
         "库洛域名代理（重启生效）",
         "库洛域名代理（重启生效）",
@@ -0,0 +1,87 @@
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Tuple, Union
+
+from .roversign_config import RoverSignConfig
+
+
+@dataclass(frozen=True)
+class RunConfig:
+    """单次签到运行的配置快照
+
+    在运行开始时构建一次，之后整个签到流程只读取该快照，
+    避免逐账号反复读取配置，也保证运行中途修改配置不会改变本次行为。
+    """
+
+    waves_signin: bool  # 用户鸣潮游戏签到开关
+    pgr_signin: bool  # 用户战双游戏签到开关
+    bbs_signin: bool  # 用户库街区每日任务开关
+    signin_master: bool  # 全部开启签到
+    sched_signin: bool  # 定时签到
+    bbs_sched_signin: bool  # 定时库街区每日任务
+    bbs_link: FrozenSet[str]  # 库街区任务列表
+    concurrent_num: int  # 自动签到并发数量
+    sign_interval: Tuple[float, float]  # 自动签到并发数量间隔
+    sign_deadline: int  # 自动签到截止时长（秒），0 为不限制
+    private_report: bool  # 签到私聊报告
+    group_report: bool  # 签到群组报告
+    group_report_pic: bool  # 签到群组图片报告
+    report_pic_format: str  # 签到图片报告格式
+    report_pic_quality: int  # 签到图片报告质量
+    report_pic_max_bytes: int  # 签到图片报告大小上限，0 为不限制
+    complete_text: str  # 签到完成文案
+    incomplete_text: str  # 签到未完成文案
+    skip_text: str  # 签到跳过文案
+
+    @classmethod
+    def load(cls) -> "RunConfig":
+        """读取当前配置，构建快照"""
+
+        def get(name: str):
+            return RoverSignConfig.get_config(name).data
+
+        bbs_link = get("BBSLink")
+        interval = get("SigninConcurrentNumInterval")
+        if interval and len(interval) >= 2:
+            sign_interval = (float(interval[0]), float(interval[1]))
+        else:
+            sign_interval = (2.0, 3.0)
+
+        return cls(
+            waves_signin=bool(get("UserWavesSignin")),
+            pgr_signin=bool(get("UserPGRSignin")),
+            bbs_signin=bool(get("UserBBSSchedSignin")),
+            signin_master=bool(get("SigninMaster")),
+            sched_signin=bool(get("SchedSignin")),
+            bbs_sched_signin=bool(get("BBSSchedSignin")),
+            bbs_link=frozenset(bbs_link) if bbs_link else frozenset(),
+            concurrent_num=max(int(get("SigninConcurrentNum")), 1),
+            sign_interval=sign_interval,
+            sign_deadline=max(int(get("SignDeadline")), 0) * 60,
+            private_report=bool(get("PrivateSignReport")),
+            group_report=bool(get("GroupSignReport")),
+            group_report_pic=bool(get("GroupSignReportPic")),
+            report_pic_format=get("GroupSignReportPicFormat"),
+            report_pic_quality=int(get("GroupSignReportPicQuality")),
+            report_pic_max_bytes=max(int(get("GroupSignReportPicMaxBytes")), 0),
+            complete_text=get("SignCompleteText"),
+            incomplete_text=get("SignIncompleteText"),
+            skip_text=get("SignSkipText"),
+        )
+
+    @property
+    def auto_sign_enabled(self) -> bool:
+        """是否需要执行自动签到"""
+        return self.bbs_sched_signin or self.sched_signin or self.pgr_signin
+
+    @property
+    def game_sched_enabled(self) -> bool:
+        """定时游戏签到是否开启"""
+        return self.sched_signin or self.signin_master
+
+    def sign_status(self) -> Dict[Union[bool, str], str]:
+        """签到状态文案"""
+        return {
+            True: self.complete_text,
+            False: self.incomplete_text,
+            "skip": self.skip_text,
+        }
@@ -1,13 +1,15 @@
 import json
+import asyncio
 from pathlib import Path
-from typing import Dict
+from typing import Any, Dict, Tuple, Union
 
 from PIL import Image
 
 from gsuid_core.help.draw_new_plugin_help import get_new_help
 from gsuid_core.help.model import PluginHelp
 from gsuid_core.sv import get_plugin_available_prefix
-from ..utils.image import get_footer
+from ..utils.image import get_footer, get_texture
+from ..utils.render import render_pool
 from ..version import RoverSign_version
 
 ICON = Path(__file__).parent.parent.parent / "ICON.png"
@@ -23,25 +25,84 @@ def get_help_data() -> Dict[str, PluginHelp]:
 
 
 plugin_help = get_help_data()
+plugin_help_mtime = HELP_DATA.stat().st_mtime_ns
+
+# (版本, help.json 修改时间, 前缀, 权限) -> 渲染好的帮助图
+HelpKey = Tuple[str, int, str, int]
+_help_cache: Dict[HelpKey, Union[bytes, str]] = {}
+_help_lock = asyncio.Lock()
+
+
+def get_help_key(pm: int) -> HelpKey:
+    return (
+        RoverSign_version,
+        HELP_DATA.stat().st_mtime_ns,
+        get_plugin_available_prefix("RoverSign"),
+        pm,
+    )
+
+
+def load_help_images() -> Dict[str, Image.Image]:
+    """读取并解码帮助图的素材（在渲染线程池中执行，解码结果会被缓存）"""
+    return {
+        "plugin_icon": get_texture(ICON).copy(),
+        "banner_bg": get_texture(TEXT_PATH / "banner_bg.jpg").copy(),
+        "help_bg": get_texture(TEXT_PATH / "bg.jpg").copy(),
+        "cag_bg": get_texture(TEXT_PATH / "cag_bg.png").copy(),
+        "item_bg": get_texture(TEXT_PATH / "item.png").copy(),
+        "footer": get_footer(),
+    }
 
 
 async def get_help(pm: int):
-    PREFIX = get_plugin_available_prefix("RoverSign")
-    return await get_new_help(
-        plugin_name="RoverSign",
-        plugin_info={f"v{RoverSign_version}": ""},
-        plugin_icon=Image.open(ICON),
-        plugin_help=plugin_help,
-        plugin_prefix=PREFIX,
-        help_mode="dark",
-        banner_bg=Image.open(TEXT_PATH / "banner_bg.jpg"),
-        banner_sub_text="为了寻回记忆而踏上旅途。",
-        help_bg=Image.open(TEXT_PATH / "bg.jpg"),
-        cag_bg=Image.open(TEXT_PATH / "cag_bg.png"),
-        item_bg=Image.open(TEXT_PATH / "item.png"),
-        icon_path=ICON_PATH,
-        footer=get_footer(),
-        enable_cache=True,
-        column=4,
-        pm=pm,
+    """帮助图渲染一次后缓存，版本、help.json 或前缀变化时重新渲染"""
+    key = get_help_key(pm)
+    if key in _help_cache:
+        return _help_cache[key]
+
+    async with _help_lock:
+        if key not in _help_cache:
+            # 丢弃旧版本的缓存
+            for old_key in [k for k in _help_cache if k[:3] != key[:3]]:
+                del _help_cache[old_key]
+            _help_cache[key] = await draw_help(key)
+    return _help_cache[key]
+
+
+def render_help(help_data: Dict[str, Any], prefix: str, pm: int):
+    """
+    绘制帮助图（在渲染线程池中执行）
+    get_new_help 是协程但全程都是 PIL 绘制，在渲染线程中用独立的事件循环运行
+    """
+    images = load_help_images()
+    return asyncio.run(
+        get_new_help(
+            plugin_name="RoverSign",
+            plugin_info={f"v{RoverSign_version}": ""},
+            plugin_icon=images["plugin_icon"],
+            plugin_help=help_data,
+            plugin_prefix=prefix,
+            help_mode="dark",
+            banner_bg=images["banner_bg"],
+            banner_sub_text="为了寻回记忆而踏上旅途。",
+            help_bg=images["help_bg"],
+            cag_bg=images["cag_bg"],
+            item_bg=images["item_bg"],
+            icon_path=ICON_PATH,
+            footer=images["footer"],
+            enable_cache=False,
+            column=4,
+            pm=pm,
+        )
     )
+
+
+async def draw_help(key: HelpKey):
+    global plugin_help, plugin_help_mtime
+
+    _, mtime, PREFIX, pm = key
+    if mtime != plugin_help_mtime:
+        plugin_help = await render_pool.run("help_data", get_help_data)
+        plugin_help_mtime = mtime
+
+    return await render_pool.run("help", render_help, plugin_help, PREFIX, pm)
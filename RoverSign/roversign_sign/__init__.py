@@ -2,18 +2,28 @@ from gsuid_core.aps import scheduler
 from gsuid_core.bot import Bot
 from gsuid_core.logger import logger
 from gsuid_core.models import Event
+from gsuid_core.server import on_core_start, on_core_shutdown
 from gsuid_core.subscribe import gs_subscribe
 from gsuid_core.sv import SV
 
 from ..roversign_config.roversign_config import RoverSignConfig
 from ..utils.constant import BoardcastTypeEnum
+from ..utils.cooldown import CommandCooldown
 from ..utils.database.models import RoverSign
+from ..utils.database.history import RoverSignHistory
+from ..utils.database.migrations import run_migrations
+from ..utils.database.sign_buffer import sign_buffer
+from ..utils.render import render_pool
 from ..utils.util import get_two_days_ago_date
 from .new_sign import rover_auto_sign_task, rover_sign_up_handler
+from .sign_job import submit_sign_job, shutdown_sign_jobs
 
 sv_waves_sign = SV("RoverSign-签到", priority=1)
 waves_sign_all = SV("RoverSign-全部签到", pm=1)
 
+# 签到指令结果缓存
+sign_cooldown: CommandCooldown[str] = CommandCooldown()
+
 # 签到时间
 SIGN_TIME = RoverSignConfig.get_config("SignTime").data
 
@@ -30,7 +40,21 @@ SIGN_TIME = RoverSignConfig.get_config("SignTime").data
     block=True,
 )
 async def rover_user_sign(bot: Bot, ev: Event):
-    msg = await rover_sign_up_handler(bot, ev)
+    async_reply = RoverSignConfig.get_config("SignAsyncReply").data
+
+    async def handler():
+        if async_reply:
+            # 立即回复当前状态，签到完成后再推送结果
+            return await submit_sign_job(bot, ev)
+        return await rover_sign_up_handler(bot, ev)
+
+    # 冷却时间内重复触发直接返回上次结果，并发触发只执行一次
+    key = (ev.user_id, ev.bot_id)
+    cooldown = RoverSignConfig.get_config("SignCommandCooldown").data
+    msg = await sign_cooldown.run(key, cooldown, handler)
+    if async_reply:
+        # 后台签到的受理回复不是签到结果，不缓存
+        sign_cooldown.clear(key)
     return await bot.send(msg)
 
 
@@ -129,8 +153,45 @@ async def rover_sign_result(bot: Bot, ev: Event):
     await bot.send(f"[RoverSign] [订阅签到结果] 已{option}订阅!")
 
 
-@scheduler.scheduled_job("cron", hour=0, minute=5)
 async def clear_sign_record():
-    """清除2天前的签到记录"""
-    await RoverSign.clear_sign_record(get_two_days_ago_date())
-    logger.info("[RoverSign] [清除签到记录] 已清除2天前的签到记录!")
+    """汇总并清除2天前的签到记录"""
+    date = get_two_days_ago_date()
+    await RoverSignHistory.rollup(date)
+    removed, elapsed = await RoverSign.clear_sign_record(date)
+    logger.info(
+        f"[RoverSign] [清除签到记录] 已清除2天前的签到记录 {removed} 条，"
+        f"耗时 {elapsed:.2f}s"
+    )
+
+
+CLEAR_TIME = RoverSignConfig.get_config("ClearSignRecordTime").data
+scheduler.add_job(
+    clear_sign_record,
+    "cron",
+    id="rs_clear",
+    hour=int(CLEAR_TIME[0]),
+    minute=CLEAR_TIME[1],
+)
+
+
+@on_core_start
+async def migrate_database():
+    """升级 RoverSign 数据表结构"""
+    await run_migrations()
+
+
+@on_core_shutdown
+async def stop_sign_jobs():
+    """停止后台签到（需在写入签到状态之前）"""
+    await shutdown_sign_jobs()
+
+
+@on_core_shutdown
+async def flush_sign_buffer():
+    """关闭前写入未落库的签到状态"""
+    await sign_buffer.flush()
+
+
+@on_core_shutdown
+async def shutdown_render_pool():
+    render_pool.shutdown()
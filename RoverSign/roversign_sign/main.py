@@ -1,17 +1,24 @@
 import asyncio
 import random
-from typing import Dict, Optional, Set, Union
+from functools import lru_cache
+from typing import AbstractSet, Dict, Optional, Set, Tuple
 
 from PIL import Image, ImageDraw
 
 from gsuid_core.logger import logger
-from gsuid_core.segment import MessageSegment
 
 from ..roversign_config.roversign_config import RoverSignConfig
+from ..roversign_config.run_config import RunConfig
 from ..utils.database.models import RoverSign, RoverSignData
+from ..utils.database.sign_buffer import sign_buffer
 from ..utils.database.states import SignStatus
-from ..utils.fonts.waves_fonts import waves_font_24
+from ..utils.errors import ROVER_CODE_999, ROVER_CODE_BBS_PARTIAL
+from ..utils.fonts.waves_fonts import get_font
+from ..utils.lease import cookie_key, sign_lease
+from ..utils.render import encode_image
 from ..utils.rover_api import rover_api
+from .outcome import SignOutcome, SignReport
+from .planner import SignPlan
 
 BBS_TASK_KEYWORDS: Dict[str, str] = {
     "bbs_sign": "签到",
@@ -42,19 +49,21 @@ def get_task_key_from_remark(remark: Optional[str]) -> Optional[str]:
     return None
 
 
-async def get_sign_interval(is_bbs: bool = False):
-    next_group_sign_time = RoverSignConfig.get_config(
-        "SigninConcurrentNumInterval"
-    ).data
-    ratio = random.uniform(1, 2) if is_bbs else 1
-    if not next_group_sign_time:
-        return random.uniform(2, 3) * ratio
+def get_bbs_state(rover_sign):
     return (
-        random.uniform(float(next_group_sign_time[0]), float(next_group_sign_time[1]))
-        * ratio
+        rover_sign.bbs_sign,
+        rover_sign.bbs_detail,
+        rover_sign.bbs_like,
+        rover_sign.bbs_share,
     )
 
 
+async def get_sign_interval(is_bbs: bool, run_config: RunConfig):
+    """账号之间的间隔，社区签到额外乘以 1~2 倍"""
+    ratio = random.uniform(1, 2) if is_bbs else 1
+    return random.uniform(*run_config.sign_interval) * ratio
+
+
 async def do_sign_in(taskData, uid, token, rover_sign: RoverSignData):
     if (
         taskData["completeTimes"] == taskData["needActionTimes"]
@@ -176,21 +185,37 @@ async def do_share(
     return False
 
 
-async def do_single_task(uid, token) -> Union[bool, Dict[str, bool]]:
+async def do_single_task(
+    uid, token, bbs_link_config: Optional[AbstractSet[str]] = None
+) -> SignOutcome:
+    """社区任务（同一账号并发调用只执行一次）"""
+    return await sign_lease.run(
+        f"bbs:{cookie_key(token)}",
+        lambda: _do_single_task(uid, token, bbs_link_config),
+    )
+
+
+async def _do_single_task(
+    uid, token, bbs_link_config: Optional[AbstractSet[str]] = None
+) -> SignOutcome:
     rover_sign = await RoverSign.get_sign_data(uid)
     if not rover_sign:
         rover_sign = RoverSignData.build_bbs_sign(uid)
+    bbs_state = get_bbs_state(rover_sign)
 
-    bbs_link_config = get_bbs_link_config()
+    if bbs_link_config is None:
+        bbs_link_config = get_bbs_link_config()
     if not bbs_link_config:
-        return True
+        return SignOutcome.skipped("社区签到成功")
 
     # 任务列表
     task_res = await rover_api.get_task(token, uid)
     if not task_res or not task_res.success:
-        return False
+        return SignOutcome.fail(
+            "社区签到失败", task_res.code if task_res else ROVER_CODE_999
+        )
     if not task_res.data or not isinstance(task_res.data, dict):
-        return False
+        return SignOutcome.fail("社区签到失败", task_res.code)
 
     daily_tasks = task_res.data.get("dailyTask") or []
     filtered_tasks = []
@@ -200,7 +225,7 @@ async def do_single_task(uid, token) -> Union[bool, Dict[str, bool]]:
             filtered_tasks.append((task_key, task))
 
     if not filtered_tasks:
-        return True
+        return SignOutcome.skipped("社区签到成功")
 
     if all(
         task["completeTimes"] == task["needActionTimes"] for _, task in filtered_tasks
@@ -225,8 +250,8 @@ async def do_single_task(uid, token) -> Union[bool, Dict[str, bool]]:
             rover_sign.bbs_share = SignStatus.BBS_SHARE
             is_save = True
         if is_save:
-            await RoverSign.upsert_rover_sign(rover_sign)
-        return True
+            sign_buffer.put(RoverSignData.bbs_state_of(rover_sign))
+        return SignOutcome.already("社区签到成功")
 
     # check 1
     need_post_list_flag = any(
@@ -240,7 +265,10 @@ async def do_single_task(uid, token) -> Union[bool, Dict[str, bool]]:
         # 获取帖子
         form_list_res = await rover_api.get_form_list(token)
         if not form_list_res or not form_list_res.success:
-            return False
+            return SignOutcome.fail(
+                "社区签到失败",
+                form_list_res.code if form_list_res else ROVER_CODE_999,
+            )
         if form_list_res.data and isinstance(form_list_res.data, dict):
             # 获取到帖子列表
             post_list = form_list_res.data["postList"]
@@ -250,7 +278,7 @@ async def do_single_task(uid, token) -> Union[bool, Dict[str, bool]]:
                 f"[鸣潮][社区签到]获取帖子列表失败 uid: {uid} res: {form_list_res}"
             )
             # 未获取帖子列表
-            return False
+            return SignOutcome.fail("社区签到失败", form_list_res.code)
 
     form_result = {
         BBS_TASK_LABELS[task_key]: False
@@ -279,186 +307,80 @@ async def do_single_task(uid, token) -> Union[bool, Dict[str, bool]]:
 
         await asyncio.sleep(random.uniform(0, 1))
 
-    await RoverSign.upsert_rover_sign(rover_sign)
+    # 没有变化时不再写入
+    if bbs_state != get_bbs_state(rover_sign):
+        sign_buffer.put(RoverSignData.bbs_state_of(rover_sign))
+
+    msg = [f"特征码: {uid}"]
+    for label, result in form_result.items():
+        msg.append(f"{label}: {'成功' if result else '失败'}")
+    if all(form_result.values()):
+        return SignOutcome.signed("\n".join(msg), detail=form_result)
+    # 部分任务失败
+    return SignOutcome.fail(
+        "\n".join(msg), code=ROVER_CODE_BBS_PARTIAL, detail=form_result
+    )
+
 
-    return form_result
+def notify_subscribers(
+    report: SignReport,
+    plan: SignPlan,
+    outcome: SignOutcome,
+    is_bbs: bool = False,
+    group_prefix: str = "",
+):
+    """将同一账号的签到结果分发给所有绑定者，同一用户的同一推送目标只推送一次"""
+    notified: Set[Tuple[str, str, str]] = set()
+    for sub in plan.subscribers:
+        gid = sub.bbs_sign_switch if is_bbs else sub.sign_switch
+        key = (sub.bot_id, sub.user_id, gid)
+        if key in notified:
+            continue
+        notified.add(key)
+        report.notify(sub.bot_id, sub.uid, gid, sub.user_id, outcome, group_prefix)
 
 
 async def single_task(
-    bot_id: str,
-    uid: str,
-    gid: str,
-    qid: str,
-    ck: str,
-    private_msgs: Dict,
-    group_msgs: Dict,
-    all_msgs: Dict,
+    plan: SignPlan,
+    report: SignReport,
+    bbs_link_config: Optional[AbstractSet[str]] = None,
 ):
-    im = await do_single_task(uid, ck)
-    if isinstance(im, dict):
-        msg = []
-        msg.append(f"特征码: {uid}")
-        for i, r in im.items():
-            if r:
-                msg.append(f"{i}: 成功")
-            else:
-                msg.append(f"{i}: 失败")
-
-        im = "\n".join(msg)
-    elif isinstance(im, bool):
-        if im:
-            im = "社区签到成功"
-        else:
-            im = "社区签到失败"
-    else:
-        return
+    uid, ck = plan.user.uid, plan.user.cookie
+    outcome = await do_single_task(uid, ck, bbs_link_config)
+    logger.debug(f"[鸣潮][社区签到]签到结果 uid: {uid} res: {outcome}")
 
-    logger.debug(f"[鸣潮][社区签到]签到结果 uid: {uid} res: {im}")
+    if outcome.ok:
+        # 同一账号下的其他 UID 共享社区任务状态
+        for other_uid in plan.uids:
+            if other_uid == uid:
+                continue
+            sign_buffer.put(RoverSignData.build_bbs_complete(other_uid))
 
-    if gid == "on":
-        if qid not in private_msgs:
-            private_msgs[qid] = []
-        private_msgs[qid].append(
-            {"bot_id": bot_id, "uid": uid, "msg": [MessageSegment.text(im)]}
-        )
-        if "失败" in im:
-            all_msgs["failed"] += 1
-        else:
-            all_msgs["success"] += 1
-    elif gid == "off":
-        if "失败" in im:
-            all_msgs["failed"] += 1
-        else:
-            all_msgs["success"] += 1
-    else:
-        # 向群消息推送列表添加这个群
-        if gid not in group_msgs:
-            group_msgs[gid] = {
-                "bot_id": bot_id,
-                "success": 0,
-                "failed": 0,
-                "push_message": [],
-            }
-
-        if "失败" in im:
-            all_msgs["failed"] += 1
-            group_msgs[gid]["failed"] += 1
-            group_msgs[gid]["push_message"].extend(
-                [
-                    MessageSegment.text("\n"),
-                    MessageSegment.at(qid),
-                    MessageSegment.text(im),
-                ]
-            )
-        else:
-            all_msgs["success"] += 1
-            group_msgs[gid]["success"] += 1
-
-
-async def single_daily_sign(
-    bot_id: str,
-    uid: str,
-    gid: str,
-    qid: str,
-    ck: str,
-    private_msgs: Dict,
-    group_msgs: Dict,
-    all_msgs: Dict,
-):
-    im = await sign_in(uid, ck)
-    if gid == "on":
-        if qid not in private_msgs:
-            private_msgs[qid] = []
-        private_msgs[qid].append(
-            {"bot_id": bot_id, "uid": uid, "msg": [MessageSegment.text(im)]}
-        )
-        if "失败" in im:
-            all_msgs["failed"] += 1
-        elif "已签到" not in im:
-            all_msgs["success"] += 1
-    elif gid == "off":
-        if "失败" in im:
-            all_msgs["failed"] += 1
-        elif "已签到" not in im:
-            all_msgs["success"] += 1
-    else:
-        # 向群消息推送列表添加这个群
-        if gid not in group_msgs:
-            group_msgs[gid] = {
-                "bot_id": bot_id,
-                "success": 0,
-                "failed": 0,
-                "push_message": [],
-            }
-        if "失败" in im:
-            all_msgs["failed"] += 1
-            group_msgs[gid]["failed"] += 1
-            group_msgs[gid]["push_message"].extend(
-                [
-                    MessageSegment.text("\n"),
-                    MessageSegment.at(qid),
-                    MessageSegment.text(im),
-                ]
-            )
-        elif "已签到" not in im:
-            all_msgs["success"] += 1
-            group_msgs[gid]["success"] += 1
-
-
-async def single_pgr_daily_sign(
-    bot_id: str,
-    uid: str,
-    gid: str,
-    qid: str,
-    ck: str,
-    private_msgs: Dict,
-    group_msgs: Dict,
-    all_msgs: Dict,
-):
+    report.record("bbs", outcome)
+    notify_subscribers(report, plan, outcome, is_bbs=True)
+
+
+async def single_daily_sign(plan: SignPlan, report: SignReport):
+    outcome = await sign_in(plan.user.uid, plan.user.cookie)
+    report.record("waves", outcome)
+    notify_subscribers(report, plan, outcome)
+
+
+async def single_pgr_daily_sign(plan: SignPlan, report: SignReport):
     """战双游戏签到（用于自动签到任务）"""
-    im = await pgr_sign_in(uid, ck)
-    if im is None:
-        return
-    if gid == "on":
-        if qid not in private_msgs:
-            private_msgs[qid] = []
-        private_msgs[qid].append(
-            {"bot_id": bot_id, "uid": uid, "msg": [MessageSegment.text(im)]}
-        )
-        if "失败" in im:
-            all_msgs["failed"] += 1
-        elif "已签到" not in im:
-            all_msgs["success"] += 1
-    elif gid == "off":
-        if "失败" in im:
-            all_msgs["failed"] += 1
-        elif "已签到" not in im:
-            all_msgs["success"] += 1
-    else:
-        # 向群消息推送列表添加这个群
-        if gid not in group_msgs:
-            group_msgs[gid] = {
-                "bot_id": bot_id,
-                "success": 0,
-                "failed": 0,
-                "push_message": [],
-            }
-        if "失败" in im:
-            all_msgs["failed"] += 1
-            group_msgs[gid]["failed"] += 1
-            group_msgs[gid]["push_message"].extend(
-                [
-                    MessageSegment.text("\n"),
-                    MessageSegment.at(qid),
-                    MessageSegment.text(f"[战双] {im}"),
-                ]
-            )
-        elif "已签到" not in im:
-            all_msgs["success"] += 1
-            group_msgs[gid]["success"] += 1
+    outcome = await pgr_sign_in(plan.user.uid, plan.user.cookie)
+    report.record("pgr", outcome)
+    notify_subscribers(report, plan, outcome, group_prefix="[战双] ")
 
 
-async def sign_in(uid: str, ck: str, isForce: bool = False) -> str:
+async def sign_in(uid: str, ck: str, isForce: bool = False) -> SignOutcome:
+    """鸣潮游戏签到（同一 UID 并发调用只执行一次）"""
+    return await sign_lease.run(
+        f"waves:{uid}", lambda: _sign_in(uid, ck, isForce)
+    )
+
+
+async def _sign_in(uid: str, ck: str, isForce: bool = False) -> SignOutcome:
     """鸣潮游戏签到"""
     from ..utils.api.api import WAVES_GAME_ID
 
@@ -471,28 +393,37 @@ async def sign_in(uid: str, ck: str, isForce: bool = False) -> str:
 
         if hasSignIn:
             # 已经签到
-            await RoverSign.upsert_rover_sign(RoverSignData.build_game_sign(uid))
+            sign_buffer.put(RoverSignData.build_game_sign(uid))
             logger.debug(f"UID{uid} 该用户今日已签到,跳过...")
-            return "今日已签到！请勿重复签到！"
+            return SignOutcome.already()
 
     sign_in_res = await rover_api.sign_in(uid, ck, gameId=WAVES_GAME_ID)
     if sign_in_res.success:
         # 签到成功
-        await RoverSign.upsert_rover_sign(RoverSignData.build_game_sign(uid))
-        return "签到成功！"
+        sign_buffer.put(RoverSignData.build_game_sign(uid))
+        return SignOutcome.signed()
     elif sign_in_res.code == 1511:
         # 已经签到
-        await RoverSign.upsert_rover_sign(RoverSignData.build_game_sign(uid))
+        sign_buffer.put(RoverSignData.build_game_sign(uid))
         logger.debug(f"UID{uid} 该用户今日已签到,跳过...")
-        return "今日已签到！请勿重复签到！"
+        return SignOutcome.already()
 
     # 签到失败
-    return "签到失败！"
+    return SignOutcome.fail(code=sign_in_res.code)
 
 
 async def pgr_sign_in(
     uid: str, ck: str, isForce: bool = False
-) -> Optional[str]:
+) -> SignOutcome:
+    """战双游戏签到（同一 UID 并发调用只执行一次）"""
+    return await sign_lease.run(
+        f"pgr:{uid}", lambda: _pgr_sign_in(uid, ck, isForce)
+    )
+
+
+async def _pgr_sign_in(
+    uid: str, ck: str, isForce: bool = False
+) -> SignOutcome:
     """战双游戏签到"""
     from ..utils.api.api import PGR_GAME_ID
 
@@ -503,15 +434,15 @@ async def pgr_sign_in(
 
     if not role_list_res.success:
         logger.debug(f"[战双签到] 获取角色列表失败: {role_list_res.msg}")
-        return None
+        return SignOutcome.skipped()
 
     role_list_data = role_list_res.data
     if role_list_data is None or (isinstance(role_list_data, list) and not role_list_data):
         logger.debug(f"[战双签到] 角色列表为空")
-        return None
+        return SignOutcome.skipped()
     if not isinstance(role_list_data, list):
         logger.debug(f"[战双签到] 角色列表数据异常 - data type: {type(role_list_data)}")
-        return None
+        return SignOutcome.skipped()
 
     logger.debug(f"[pgr_sign_in] 角色列表数量: {len(role_list_data)}")
 
@@ -527,7 +458,7 @@ async def pgr_sign_in(
         logger.debug(
             f"[战双签到] 未找到匹配的角色 UID: {uid}, 可用角色: {[r.get('roleId') for r in role_list_data]}"
         )
-        return None
+        return SignOutcome.skipped()
 
     server_id = pgr_role.get("serverId")
     logger.info(f"[战双签到] UID: {uid}, serverId: {server_id}, serverName: {pgr_role.get('serverName')}, roleName: {pgr_role.get('roleName')}")
@@ -545,9 +476,9 @@ async def pgr_sign_in(
 
         if hasSignIn:
             # 已经签到
-            await RoverSign.upsert_rover_sign(RoverSignData.build_pgr_game_sign(uid))
+            sign_buffer.put(RoverSignData.build_pgr_game_sign(uid))
             logger.debug(f"PGR UID{uid} 该用户今日已签到,跳过...")
-            return "今日已签到！请勿重复签到！"
+            return SignOutcome.already()
 
     logger.debug(f"[pgr_sign_in] 调用 sign_in 执行签到 - pgr_uid: {uid}, gameId: {PGR_GAME_ID}, serverId: {server_id}")
     sign_in_res = await rover_api.sign_in(uid, ck, gameId=PGR_GAME_ID, serverId=server_id)
@@ -555,18 +486,30 @@ async def pgr_sign_in(
 
     if sign_in_res.success:
         # 签到成功
-        await RoverSign.upsert_rover_sign(RoverSignData.build_pgr_game_sign(uid))
+        sign_buffer.put(RoverSignData.build_pgr_game_sign(uid))
         logger.debug("[pgr_sign_in] 签到成功")
-        return "签到成功！"
+        return SignOutcome.signed()
     elif sign_in_res.code == 1511:
         # 已经签到
-        await RoverSign.upsert_rover_sign(RoverSignData.build_pgr_game_sign(uid))
+        sign_buffer.put(RoverSignData.build_pgr_game_sign(uid))
         logger.debug("[pgr_sign_in] 今日已签到 (code 1511)")
-        return "今日已签到！请勿重复签到！"
+        return SignOutcome.already()
 
     # 签到失败
     logger.error(f"[战双签到] 签到失败: code={sign_in_res.code}, msg={sign_in_res.msg}, data={sign_in_res.data}")
-    return f"签到失败：{sign_in_res.msg}"
+    return SignOutcome.fail(f"签到失败：{sign_in_res.msg}", sign_in_res.code)
+
+
+# 签到报告卡片尺寸
+SIGN_CARD_SIZE = (600, 250)
+
+# 预定义主题颜色
+SIGN_CARD_THEMES = {
+    "blue": (230, 230, 255),  # 浅蓝
+    "yellow": (255, 255, 230),  # 浅黄
+    "pink": (255, 230, 230),  # 浅粉
+    "green": (230, 255, 230),  # 浅绿
+}
 
 
 def create_gradient_background(width, height, start_color, end_color=(255, 255, 255)):
@@ -575,65 +518,74 @@ def create_gradient_background(width, height, start_color, end_color=(255, 255,
     start_color: 起始颜色，如 (230, 230, 255) 浅蓝
     end_color: 结束颜色，默认白色
     """
-    # 创建新图像
-    image = Image.new("RGB", (width, height))
+    # 返回副本，调用方可以直接在上面绘制
+    return _gradient_background(
+        width, height, tuple(start_color), tuple(end_color)
+    ).copy()
 
+
+@lru_cache(maxsize=16)
+def _gradient_background(width, height, start_color, end_color):
+    # 渐变只沿竖直方向变化：先生成一列像素，再横向拉伸
+    colors = []
     for y in range(height):
         # 计算当前行的颜色比例
         ratio = y / height
+        colors.append(
+            tuple(
+                int(end * ratio + start * (1 - ratio))
+                for start, end in zip(start_color, end_color)
+            )
+        )
 
-        # 计算当前行的 RGB 值
-        r = int(end_color[0] * ratio + start_color[0] * (1 - ratio))
-        g = int(end_color[1] * ratio + start_color[1] * (1 - ratio))
-        b = int(end_color[2] * ratio + start_color[2] * (1 - ratio))
+    column = Image.new("RGB", (1, height))
+    column.putdata(colors)
+    return column.resize((width, height), Image.NEAREST)
 
-        # 创建当前行的颜色
-        line_color = (r, g, b)
-        # 绘制当前行
-        for x in range(width):
-            image.putpixel((x, y), line_color)
 
-    return image
+@lru_cache(maxsize=len(SIGN_CARD_THEMES))
+def _sign_card_base(theme: str):
+    """渐变背景和装饰边框，每个主题只绘制一次"""
+    width, height = SIGN_CARD_SIZE
+    # 获取主题颜色，默认浅蓝
+    start_color = SIGN_CARD_THEMES.get(theme, SIGN_CARD_THEMES["blue"])
+    img = _gradient_background(width, height, start_color, (255, 255, 255)).copy()
+
+    # 绘制装饰边框
+    border_color = (200, 200, 200)
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([(10, 10), (width - 10, height - 10)], outline=border_color, width=2)
+    return img
 
 
 def create_sign_info_image(text, theme="blue"):
     text = text[1:]
-    # 创建图片
-    width = 600
-    height = 250  # 稍微减小高度使布局更紧凑
-
-    # 预定义主题颜色
-    themes = {
-        "blue": (230, 230, 255),  # 浅蓝
-        "yellow": (255, 255, 230),  # 浅黄
-        "pink": (255, 230, 230),  # 浅粉
-        "green": (230, 255, 230),  # 浅绿
-    }
+    if theme not in SIGN_CARD_THEMES:
+        theme = "blue"
 
-    # 获取主题颜色，默认浅蓝
-    start_color = themes.get(theme, themes["blue"])
-
-    # 创建渐变背景
-    img = create_gradient_background(width, height, start_color)
+    # 在预先绘制好的背景上只绘制文字
+    img = _sign_card_base(theme).copy()
     draw = ImageDraw.Draw(img)
 
     # 颜色定义
     title_color = (51, 51, 51)  # 标题色
 
-    # 绘制装饰边框
-    border_color = (200, 200, 200)
-    draw.rectangle([(10, 10), (width - 10, height - 10)], outline=border_color, width=2)
-
     # 文本处理
     lines = text.split("\n")
     left_margin = 40  # 左边距
     y = 40  # 起始y坐标
+    font = get_font(24)
 
     for i, line in enumerate(lines):
-        draw.text((left_margin, y), line, font=waves_font_24, fill=title_color)
+        draw.text((left_margin, y), line, font=font, fill=title_color)
         if i == 0:
             y += 60
         else:
             y += 45
 
     return img
+
+
+def render_sign_card(text, theme="blue", fmt="png", quality=85) -> bytes:
+    """绘制并编码签到报告卡片（在渲染线程池中执行）"""
+    return encode_image(create_sign_info_image(text, theme), fmt, quality)
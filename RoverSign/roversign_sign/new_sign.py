@@ -1,6 +1,8 @@
 import asyncio
 import random
-from typing import Dict, List, Literal, Optional
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Literal, Optional, Tuple, Union
 
 from gsuid_core.bot import Bot
 from gsuid_core.logger import logger
@@ -9,6 +11,7 @@ from gsuid_core.segment import MessageSegment
 from gsuid_core.utils.boardcast.models import BoardCastMsg, BoardCastMsgDict
 
 from ..roversign_config.roversign_config import RoverSignConfig
+from ..roversign_config.run_config import RunConfig
 from ..utils.boardcast import send_board_cast_msg
 from ..utils.constant import BoardcastTypeEnum
 from ..utils.database.models import (
@@ -16,22 +19,34 @@ from ..utils.database.models import (
     RoverSignData,
     WavesBind,
     WavesUser,
+    WavesUserRow,
 )
+from ..utils.database.sign_buffer import sign_buffer
 from ..utils.database.states import SignStatus
 from ..utils.errors import WAVES_CODE_101_MSG
-from ..utils.api.api import WAVES_GAME_ID, PGR_GAME_ID
+from ..utils.rate_limiter import (
+    RateLimiter,
+    use_limiter,
+    interactive_limiter,
+)
+from ..utils.render import render_pool
 from ..utils.rover_api import rover_api
 from .main import (
-    create_sign_info_image,
     do_single_task,
-    get_bbs_link_config,
     get_sign_interval,
     pgr_sign_in,
+    render_sign_card,
     sign_in,
     single_daily_sign,
     single_pgr_daily_sign,
     single_task,
 )
+from .outcome import SignReport, SignResult
+from .planner import SignPlan, build_auto_sign_plan
+
+# 自动签到中每个并发名额两次请求之间的间隔（秒），账号之间另有 SigninConcurrentNumInterval
+AUTO_SIGN_REQUEST_INTERVAL = (0.3, 0.8)
+
 
 def get_sign_status():
     """获取签到状态文案"""
@@ -47,14 +62,14 @@ def get_sign_status():
 
 
 async def get_waves_signin_config():
-    """获取鸣潮签到配置"""
+    """获取鸣潮签到配置（向后兼容，签到流程使用 RunConfig）"""
     from ..roversign_config.roversign_config import RoverSignConfig
 
     return RoverSignConfig.get_config("UserWavesSignin").data
 
 
 async def get_pgr_signin_config():
-    """获取战双签到配置"""
+    """获取战双签到配置（向后兼容，签到流程使用 RunConfig）"""
     from ..roversign_config.roversign_config import RoverSignConfig
 
     return RoverSignConfig.get_config("UserPGRSignin").data
@@ -66,15 +81,19 @@ async def get_signin_config():
 
 
 async def get_bbs_signin_config():
+    """获取库街区每日任务配置（向后兼容，签到流程使用 RunConfig）"""
     from ..roversign_config.roversign_config import RoverSignConfig
 
     return RoverSignConfig.get_config("UserBBSSchedSignin").data
 
 
-async def action_waves_sign_in(uid: str, token: str):
+async def action_waves_sign_in(
+    uid: str, token: str, run_config: Optional[RunConfig] = None
+):
     """鸣潮游戏签到"""
+    run_config = run_config or RunConfig.load()
     signed = False
-    if not await get_waves_signin_config():
+    if not run_config.waves_signin:
         return signed
     sign_res = await rover_api.sign_in_task_list(uid, token)
     if sign_res.success and sign_res.data and isinstance(sign_res.data, dict):
@@ -82,30 +101,31 @@ async def action_waves_sign_in(uid: str, token: str):
 
     if not signed:
         res = await sign_in(uid, token, isForce=True)
-        if "成功" in res or "已签到" in res:
-            signed = True
+        signed = res.ok
 
     if signed:
-        await RoverSign.upsert_rover_sign(RoverSignData.build_game_sign(uid))
+        sign_buffer.put(RoverSignData.build_game_sign(uid))
 
     return signed
 
 
-async def action_pgr_sign_in(uid: str, token: str):
+async def action_pgr_sign_in(
+    uid: str, token: str, run_config: Optional[RunConfig] = None
+):
     """战双游戏签到"""
-
+    run_config = run_config or RunConfig.load()
     signed = False
-    if not await get_pgr_signin_config():
+    if not run_config.pgr_signin:
         return signed
 
     # 战双签到需要先获取正确的 serverId，所以直接调用 pgr_sign_in
     # 不在这里检查签到状态（会因为 serverId 不正确而返回 1513 错误）
     res = await pgr_sign_in(uid, token, isForce=False)
 
-    if res is None:
+    if res.result == SignResult.SKIPPED:
         return "skip"
 
-    if "成功" in res or "已签到" in res:
+    if res.ok:
         signed = True
         logger.info(f"[战双签到] {uid} 签到完成")
 
@@ -117,27 +137,105 @@ async def action_sign_in(uid: str, token: str):
     return await action_waves_sign_in(uid, token)
 
 
-async def action_bbs_sign_in(uid: str, token: str):
+async def action_bbs_sign_in(
+    uid: str, token: str, run_config: Optional[RunConfig] = None
+):
+    """库街区每日任务"""
+    run_config = run_config or RunConfig.load()
     bbs_signed = False
-    if not await get_bbs_signin_config():
+    if not run_config.bbs_signin:
         return bbs_signed
-    bbs_signed = await do_single_task(uid, token)
-    if isinstance(bbs_signed, dict) and all(bbs_signed.values()):
-        bbs_signed = True
-    elif isinstance(bbs_signed, bool):
-        pass
-    else:
-        bbs_signed = False
+    res = await do_single_task(uid, token, run_config.bbs_link)
+    return not res.is_failed
 
-    return bbs_signed
 
+@dataclass
+class UserSignState:
+    """用户所有绑定 UID 的本地签到状态"""
+
+    run_config: RunConfig
+    waves_uid_list: List[str]
+    pgr_uid_list: List[str]
+    sign_data: Dict[str, RoverSign]
+
+    @property
+    def main_uid(self) -> Optional[str]:
+        return self.waves_uid_list[0] if self.waves_uid_list else None
+
+    def waves_complete(self, uid: str) -> bool:
+        rover_sign = self.sign_data.get(uid)
+        return bool(rover_sign and SignStatus.waves_game_sign_complete(rover_sign))
+
+    def pgr_complete(self, uid: str) -> bool:
+        rover_sign = self.sign_data.get(uid)
+        return bool(rover_sign and SignStatus.pgr_game_sign_complete(rover_sign))
+
+    def bbs_complete(self, uid: Optional[str]) -> bool:
+        rover_sign = self.sign_data.get(uid) if uid else None
+        return bool(
+            rover_sign
+            and SignStatus.bbs_sign_complete(rover_sign, self.run_config.bbs_link)
+        )
+
+    @property
+    def all_completed(self) -> bool:
+        """所有已开启的签到是否都已完成"""
+        run_config = self.run_config
+        # 检查鸣潮签到状态
+        if run_config.waves_signin and not all(
+            self.waves_complete(u) for u in self.waves_uid_list
+        ):
+            return False
+        # 检查战双签到状态
+        if run_config.pgr_signin and not all(
+            self.pgr_complete(u) for u in self.pgr_uid_list
+        ):
+            return False
+        # 检查社区签到状态
+        if (
+            run_config.bbs_signin
+            and self.main_uid
+            and not self.bbs_complete(self.main_uid)
+        ):
+            return False
+        return True
+
+    def status_msg(self, skip: bool = False) -> str:
+        """本地签到状态文案，skip 为 True 时全部显示为跳过"""
+        run_config = self.run_config
+        sign_status = run_config.sign_status()
+
+        def status(complete: bool) -> str:
+            return sign_status["skip" if skip else complete]
+
+        msg_list = []
+        if run_config.waves_signin:
+            for waves_uid in self.waves_uid_list:
+                msg_list.append(f"[鸣潮] 特征码: {waves_uid}")
+                msg_list.append(f"签到状态: {status(self.waves_complete(waves_uid))}")
+                msg_list.append("-----------------------------")
+
+        if run_config.pgr_signin:
+            for pgr_uid in self.pgr_uid_list:
+                msg_list.append(f"[战双] 特征码: {pgr_uid}")
+                msg_list.append(f"签到状态: {status(self.pgr_complete(pgr_uid))}")
+                msg_list.append("-----------------------------")
+
+        if run_config.bbs_signin and self.main_uid:
+            msg_list.append(
+                f"社区签到状态: {status(self.bbs_complete(self.main_uid))}"
+            )
+
+        return "\n".join(msg_list) if msg_list else WAVES_CODE_101_MSG
 
-async def rover_sign_up_handler(bot: Bot, ev: Event):
-    waves_enabled = await get_waves_signin_config()
-    pgr_enabled = await get_pgr_signin_config()
-    bbs_enabled = await get_bbs_signin_config()
 
-    if not waves_enabled and not pgr_enabled and not bbs_enabled:
+async def load_user_sign_state(
+    ev: Event, run_config: RunConfig
+) -> Union[str, UserSignState]:
+    """读取用户绑定的 UID 及其本地签到状态，失败时返回提示文案"""
+    if not (
+        run_config.waves_signin or run_config.pgr_signin or run_config.bbs_signin
+    ):
         return "签到功能未开启"
 
     # 获取绑定数据
@@ -157,114 +255,108 @@ async def rover_sign_up_handler(bot: Bot, ev: Event):
     if not waves_uid_list and not pgr_uid_list:
         return WAVES_CODE_101_MSG
 
-    bbs_link_config = get_bbs_link_config()
-    main_uid = waves_uid_list[0] if waves_uid_list else None
+    # 一次查询所有 UID 的本地签到状态
+    sign_data = await RoverSign.get_sign_data_by_uids(
+        list(dict.fromkeys(waves_uid_list + pgr_uid_list))
+    )
+    return UserSignState(run_config, waves_uid_list, pgr_uid_list, sign_data)
 
-    # 先检查本地签到状态，判断是否所有签到都已完成
-    all_completed = True
 
-    # 检查鸣潮签到状态
-    if waves_enabled and waves_uid_list:
-        for waves_uid in waves_uid_list:
-            rover_sign = await RoverSign.get_sign_data(waves_uid)
-            if not rover_sign or not SignStatus.waves_game_sign_complete(rover_sign):
-                all_completed = False
-                break
-
-    # 检查战双签到状态
-    if all_completed and pgr_enabled and pgr_uid_list:
-        for pgr_uid in pgr_uid_list:
-            rover_sign = await RoverSign.get_sign_data(pgr_uid)
-            if not rover_sign or not SignStatus.pgr_game_sign_complete(rover_sign):
-                all_completed = False
-                break
-
-    # 检查社区签到状态
-    if all_completed and bbs_enabled and main_uid:
-        rover_sign = await RoverSign.get_sign_data(main_uid)
-        if not rover_sign or not SignStatus.bbs_sign_complete(rover_sign, bbs_link_config):
-            all_completed = False
+async def rover_sign_up_handler(bot: Bot, ev: Event):
+    # 用户主动签到使用独立的限速器，不排在自动签到之后
+    async with use_limiter(interactive_limiter):
+        return await _rover_sign_up_handler(bot, ev)
 
-    # 如果所有签到都已完成，直接返回跳过消息，不请求任何 API
-    if all_completed:
-        msg_list = []
-        sign_status = get_sign_status()
-        if waves_enabled and waves_uid_list:
-            for waves_uid in waves_uid_list:
-                msg_list.append(f"[鸣潮] 特征码: {waves_uid}")
-                msg_list.append(f"签到状态: {sign_status['skip']}")
-                msg_list.append("-----------------------------")
 
-        if pgr_enabled and pgr_uid_list:
-            for pgr_uid in pgr_uid_list:
-                msg_list.append(f"[战双] 特征码: {pgr_uid}")
-                msg_list.append(f"签到状态: {sign_status['skip']}")
-                msg_list.append("-----------------------------")
+async def _rover_sign_up_handler(bot: Bot, ev: Event):
+    run_config = RunConfig.load()
+    state = await load_user_sign_state(ev, run_config)
+    if isinstance(state, str):
+        return state
 
-        if bbs_enabled and main_uid:
-            msg_list.append(f"社区签到状态: {sign_status['skip']}")
+    # 如果所有签到都已完成，直接返回跳过消息，不请求任何 API
+    if state.all_completed:
+        return state.status_msg(skip=True)
 
-        return "\n".join(msg_list) if msg_list else WAVES_CODE_101_MSG
+    waves_enabled = run_config.waves_signin
+    pgr_enabled = run_config.pgr_signin
+    bbs_enabled = run_config.bbs_signin
+    waves_uid_list = state.waves_uid_list
+    pgr_uid_list = state.pgr_uid_list
+    main_uid = state.main_uid
 
     # 有未完成的签到，开始获取 token 并执行签到
-    msg_list = []
     expire_uid = set()  # 使用 set 自动去重
     main_token = None
-    sign_status = get_sign_status()
+    sign_status = run_config.sign_status()
 
     if main_uid:
         main_token = await rover_api.get_self_waves_ck(main_uid, ev.user_id, ev.bot_id)
         if not main_token:
             expire_uid.add(main_uid)
 
-    # 鸣潮签到
-    if waves_enabled and waves_uid_list:
-        for waves_uid in waves_uid_list:
-            token = main_token if waves_uid == main_uid else await rover_api.get_self_waves_ck(waves_uid, ev.user_id, ev.bot_id)
+    async def waves_sign(waves_uid: str) -> List[str]:
+        if state.waves_complete(waves_uid):
+            waves_signed = "skip"
+        else:
+            if waves_uid == main_uid:
+                token = main_token
+            else:
+                token = await rover_api.get_self_waves_ck(
+                    waves_uid, ev.user_id, ev.bot_id
+                )
             if not token:
                 expire_uid.add(waves_uid)
-                continue
+                return []
+            waves_signed = await action_waves_sign_in(waves_uid, token, run_config)
+
+        return [
+            f"[鸣潮] 特征码: {waves_uid}",
+            f"签到状态: {sign_status[waves_signed]}",
+            "-----------------------------",
+        ]
+
+    async def pgr_sign(pgr_uid: str) -> List[str]:
+        if state.pgr_complete(pgr_uid):
+            pgr_signed = "skip"
+        else:
+            pgr_signed = await action_pgr_sign_in(pgr_uid, main_token, run_config)
 
-            waves_signed = False
-            rover_sign: Optional[RoverSign] = await RoverSign.get_sign_data(waves_uid)
-            if rover_sign and SignStatus.waves_game_sign_complete(rover_sign):
-                waves_signed = "skip"
+        return [
+            f"[战双] 特征码: {pgr_uid}",
+            f"签到状态: {sign_status[pgr_signed]}",
+            "-----------------------------",
+        ]
+
+    async def bbs_sign() -> List[str]:
+        bbs_signed = False
+        if main_uid:
+            if state.bbs_complete(main_uid):
+                bbs_signed = "skip"
             else:
-                waves_signed = await action_waves_sign_in(waves_uid, token)
+                bbs_signed = await action_bbs_sign_in(
+                    main_uid, main_token, run_config
+                )
 
-            msg_list.append(f"[鸣潮] 特征码: {waves_uid}")
-            msg_list.append(f"签到状态: {sign_status[waves_signed]}")
-            msg_list.append("-----------------------------")
+        return [f"社区签到状态: {sign_status[bbs_signed]}"]
 
-            await asyncio.sleep(random.randint(1, 2))
+    tasks = []
+    # 鸣潮签到
+    if waves_enabled and waves_uid_list:
+        tasks.extend(waves_sign(waves_uid) for waves_uid in waves_uid_list)
 
     # 战双签到
     if pgr_enabled and pgr_uid_list and main_token:
-        for pgr_uid in pgr_uid_list:
-            pgr_signed = False
-            rover_sign: Optional[RoverSign] = await RoverSign.get_sign_data(pgr_uid)
-            if rover_sign and SignStatus.pgr_game_sign_complete(rover_sign):
-                pgr_signed = "skip"
-            else:
-                pgr_signed = await action_pgr_sign_in(pgr_uid, main_token)
-
-            msg_list.append(f"[战双] 特征码: {pgr_uid}")
-            msg_list.append(f"签到状态: {sign_status[pgr_signed]}")
-            msg_list.append("-----------------------------")
-
-            await asyncio.sleep(random.randint(1, 2))
+        tasks.extend(pgr_sign(pgr_uid) for pgr_uid in pgr_uid_list)
 
     # 社区签到（不依赖 UID，只要有 token 就可以）
     if bbs_enabled and main_token:
-        bbs_signed = False
-        if main_uid:
-            rover_sign: Optional[RoverSign] = await RoverSign.get_sign_data(main_uid)
-            if rover_sign and SignStatus.bbs_sign_complete(rover_sign, bbs_link_config):
-                bbs_signed = "skip"
-            else:
-                bbs_signed = await action_bbs_sign_in(main_uid, main_token)
+        tasks.append(bbs_sign())
 
-        msg_list.append(f"社区签到状态: {sign_status[bbs_signed]}")
+    # 各角色并行签到，每次接口请求的节奏由共用限速器控制
+    msg_list = []
+    for lines in await asyncio.gather(*tasks):
+        msg_list.extend(lines)
 
     # 失效 UID 提示
     if expire_uid:
@@ -275,257 +367,259 @@ async def rover_sign_up_handler(bot: Bot, ev: Event):
     return "\n".join(msg_list) if msg_list else WAVES_CODE_101_MSG
 
 
-async def rover_auto_sign_task():
+async def rover_auto_sign_task(run_config: Optional[RunConfig] = None):
+    # 本次运行只读取一次配置
+    run_config = run_config or RunConfig.load()
+    # 本次运行独占的限速器，同一时刻的接口请求数不超过并发数量
+    limiter = RateLimiter(run_config.concurrent_num, AUTO_SIGN_REQUEST_INTERVAL)
+    async with use_limiter(limiter):
+        return await _rover_auto_sign_task(run_config)
 
-    need_user_list: List[WavesUser] = []
-    bbs_user = set()
-    waves_sign_user = set()
-    pgr_sign_user = set()
-    bbs_link_config = get_bbs_link_config()
-    _token_dict: Dict[str, list[str]] = {}
-    if (
-        RoverSignConfig.get_config("BBSSchedSignin").data
-        or RoverSignConfig.get_config("SchedSignin").data
-        or RoverSignConfig.get_config("UserPGRSignin").data
-    ):
-        _user_list: List[WavesUser] = await WavesUser.get_waves_all_user()
-        for user in _user_list:
-            _uid = user.user_id
-            if not _uid:
-                continue
-
-            is_signed_waves_game = False
-            is_signed_pgr_game = False
-            is_signed_bbs = False
-            rover_sign: Optional[RoverSign] = await RoverSign.get_sign_data(user.uid)
-            if rover_sign:
-                if SignStatus.waves_game_sign_complete(rover_sign):
-                    is_signed_waves_game = True
-                if SignStatus.pgr_game_sign_complete(rover_sign):
-                    is_signed_pgr_game = True
-                if SignStatus.bbs_sign_complete(rover_sign, bbs_link_config):
-                    is_signed_bbs = True
-
-            if user.game_id == WAVES_GAME_ID:
-                if is_signed_waves_game and is_signed_bbs:
-                    continue
-            elif user.game_id == PGR_GAME_ID:
-                if is_signed_pgr_game and is_signed_bbs:
-                    continue
-            elif is_signed_bbs:
-                continue
-
-            if RoverSignConfig.get_config("SigninMaster").data:
-                # 如果 SigninMaster 为 True，添加到 user_list 中
-                need_user_list.append(user)
-                if not is_signed_bbs:
-                    bbs_user.add(user.uid)
-                _token_dict.setdefault(user.cookie, []).append(user.uid)
-                # 根据 game_id 判断加入哪个游戏签到列表
-                if user.game_id == WAVES_GAME_ID and not is_signed_waves_game:
-                    waves_sign_user.add(user.uid)
-                elif user.game_id == PGR_GAME_ID and not is_signed_pgr_game:
-                    pgr_sign_user.add(user.uid)
-                continue
-
-            is_need = False
-            if user.bbs_sign_switch != "off":
-                # 如果 bbs_sign_switch 不为 'off'，添加到 user_list 中
-                bbs_user.add(user.uid)
-                is_need = True
-
-            if user.sign_switch != "off":
-                # 如果 sign_switch 不为 'off'，根据 game_id 判断加入哪个游戏签到列表
-                if user.game_id == WAVES_GAME_ID:
-                    waves_sign_user.add(user.uid)
-                elif user.game_id == PGR_GAME_ID:
-                    pgr_sign_user.add(user.uid)
-                is_need = True
-
-            if is_need:
-                need_user_list.append(user)
-
-    private_waves_sign_msgs = {}
-    group_waves_sign_msgs = {}
-    all_waves_sign_msgs = {"failed": 0, "success": 0}
-
-    private_pgr_sign_msgs = {}
-    group_pgr_sign_msgs = {}
-    all_pgr_sign_msgs = {"failed": 0, "success": 0}
-
-    private_bbs_msgs = {}
-    group_bbs_msgs = {}
-    all_bbs_msgs = {"failed": 0, "success": 0}
-
-    async def process_user(semaphore, user: WavesUser):
-        logger.debug(f"[自动签到] 处理 UID {user.uid} 的签到任务")
+
+async def _rover_auto_sign_task(run_config: RunConfig):
+    bbs_link_config = run_config.bbs_link
+    # 同一账号只签到一次，结果分发给所有绑定者
+    plan = await build_auto_sign_plan(run_config)
+
+    # 游戏签到（鸣潮和战双）与社区签到分别汇总、分别广播
+    game_report = SignReport()
+    bbs_report = SignReport(
+        (SignResult.SIGNED, SignResult.ALREADY_SIGNED, SignResult.SKIPPED)
+    )
+
+    # 截止时间：先为所有账号完成游戏签到，剩余时间再执行社区签到
+    deadline = (
+        time.monotonic() + run_config.sign_deadline
+        if run_config.sign_deadline > 0
+        else None
+    )
+    # 已完成登录校验的账号 id(user) -> 是否有效
+    checked_user: Dict[int, bool] = {}
+    # 运行结束后统一标记失效的 cookie
+    invalid_cookies: List[Dict[str, str]] = []
+
+    def mark_invalid(res, user: WavesUserRow):
+        if res.is_token_invalid:
+            invalid_cookies.append(
+                {"uid": user.uid, "cookie": user.cookie, "status": "无效"}
+            )
+
+    cut_game_user: List[str] = []
+    cut_bbs_user: List[str] = []
+
+    def is_timeout() -> bool:
+        return deadline is not None and time.monotonic() >= deadline
+
+    async def check_user(user: WavesUserRow) -> bool:
+        """登录校验，每个账号每次运行只校验一次"""
+        if id(user) in checked_user:
+            return checked_user[id(user)]
+
+        checked_user[id(user)] = False
+        if user.cookie == "":
+            return False
+        if user.status:
+            return False
+
+        user_game_id = user.game_id
+
+        login_res = await rover_api.login_log(user.uid, user.cookie, game_id=user_game_id)
+        if not login_res.success:
+            if login_res.is_bat_token_invalid:
+                if waves_user := await rover_api.refresh_bat_token(user):
+                    user.cookie = waves_user.cookie
+            else:
+                mark_invalid(login_res, user)
+            return False
+
+        refresh_res = await rover_api.refresh_data(user.uid, user.cookie, game_id=user_game_id)
+        if not refresh_res.success:
+            if refresh_res.is_bat_token_invalid:
+                if waves_user := await rover_api.refresh_bat_token(user):
+                    user.cookie = waves_user.cookie
+            else:
+                mark_invalid(refresh_res, user)
+            return False
+
+        checked_user[id(user)] = True
+        await asyncio.sleep(random.randint(1, 2))
+        return True
+
+    async def process_game_user(semaphore, sign_plan: SignPlan, is_pgr: bool):
+        user = sign_plan.user
+        logger.debug(f"[自动签到] 处理 UID {user.uid} 的游戏签到任务")
         async with semaphore:
-            await asyncio.sleep(random.random() * 1.5)
-            if user.cookie == "":
+            if is_timeout():
+                cut_game_user.append(user.uid)
                 return
-            if user.status:
+            await asyncio.sleep(random.random() * 1.5)
+            if not await check_user(user):
                 return
 
-            user_game_id = user.game_id
+            if is_pgr:
+                # 战双签到
+                logger.info(f"[战双签到] 开始为 UID {user.uid} 执行战双签到")
+                await single_pgr_daily_sign(sign_plan, game_report)
+            else:
+                # 鸣潮签到
+                await single_daily_sign(sign_plan, game_report)
 
-            login_res = await rover_api.login_log(user.uid, user.cookie, game_id=user_game_id)
-            if not login_res.success:
-                if login_res.is_bat_token_invalid:
-                    if waves_user := await rover_api.refresh_bat_token(user):
-                        user.cookie = waves_user.cookie
-                else:
-                    await login_res.mark_cookie_invalid(user.uid, user.cookie)
-                return
+            # 账号之间的间隔（SigninConcurrentNumInterval）
+            await asyncio.sleep(await get_sign_interval(False, run_config))
+            logger.info(f"[自动签到] UID {user.uid} 游戏签到任务完成")
 
-            refresh_res = await rover_api.refresh_data(user.uid, user.cookie, game_id=user_game_id)
-            if not refresh_res.success:
-                if refresh_res.is_bat_token_invalid:
-                    if waves_user := await rover_api.refresh_bat_token(user):
-                        user.cookie = waves_user.cookie
-                else:
-                    await refresh_res.mark_cookie_invalid(user.uid, user.cookie)
+    async def process_bbs_user(semaphore, sign_plan: SignPlan):
+        user = sign_plan.user
+        logger.debug(f"[自动签到] 处理 UID {user.uid} 的社区签到任务")
+        async with semaphore:
+            if is_timeout():
+                cut_bbs_user.append(user.uid)
+                return
+            await asyncio.sleep(random.random() * 1.5)
+            if not await check_user(user):
                 return
 
-            await asyncio.sleep(random.randint(1, 2))
-            
-            # 战双签到
-            if (
-                RoverSignConfig.get_config("SchedSignin").data and user.uid in pgr_sign_user
-            ) or RoverSignConfig.get_config("SigninMaster").data and user.uid in pgr_sign_user:
-                logger.info(f"[战双签到] 开始为 UID {user.uid} 执行战双签到")
-                await single_pgr_daily_sign(
-                    user.bot_id,
-                    user.uid,
-                    user.sign_switch,
-                    user.user_id,
-                    user.cookie,
-                    private_pgr_sign_msgs,
-                    group_pgr_sign_msgs,
-                    all_pgr_sign_msgs,
-                )
+            # 先检查本地签到状态，避免重复请求 API
+            sign_data = await RoverSign.get_sign_data_by_uids(sign_plan.uids)
+            if any(
+                SignStatus.bbs_sign_complete(rover, bbs_link_config)
+                for rover in sign_data.values()
+            ):
+                # 已完成社区签到，跳过
+                logger.debug(f"[社区签到] UID {user.uid} 今日已完成，跳过")
+            else:
+                await single_task(sign_plan, bbs_report, bbs_link_config)
 
-                await asyncio.sleep(random.random() * 2)
-
-            # 鸣潮签到
-            if (
-                RoverSignConfig.get_config("SchedSignin").data and user.uid in waves_sign_user
-            ) or RoverSignConfig.get_config("SigninMaster").data and user.uid in waves_sign_user:
-                await single_daily_sign(
-                    user.bot_id,
-                    user.uid,
-                    user.sign_switch,
-                    user.user_id,
-                    user.cookie,
-                    private_waves_sign_msgs,
-                    group_waves_sign_msgs,
-                    all_waves_sign_msgs,
-                )
+            await asyncio.sleep(await get_sign_interval(True, run_config))
+            logger.info(f"[自动签到] UID {user.uid} 社区签到任务完成")
 
-                await asyncio.sleep(random.random() * 2)
-                
-            # 社区签到
-            if (
-                RoverSignConfig.get_config("BBSSchedSignin").data
-                and user.uid in bbs_user
-            ) or RoverSignConfig.get_config("SigninMaster").data:
-                # 先检查本地签到状态，避免重复请求 API
-                rover_sign = [await RoverSign.get_sign_data(uid) for uid in _token_dict.get(user.cookie, [])]
-                if any([rover and SignStatus.bbs_sign_complete(rover, bbs_link_config) for rover in rover_sign]):
-                    # 已完成社区签到，跳过
-                    logger.debug(f"[社区签到] UID {user.uid} 今日已完成，跳过")
-                else:
-                    await single_task(
-                        user.bot_id,
-                        user.uid,
-                        user.bbs_sign_switch,
-                        user.user_id,
-                        user.cookie,
-                        private_bbs_msgs,
-                        group_bbs_msgs,
-                        all_bbs_msgs,
-                    )
-
-                await asyncio.sleep(random.randint(2, 4))
-            logger.info(f"[自动签到] UID {user.uid} 签到任务完成")
-
-    if not need_user_list:
+    if not plan:
         return "暂无需要签到的账号"
 
-    max_concurrent: int = RoverSignConfig.get_config("SigninConcurrentNum").data
-    semaphore = asyncio.Semaphore(max_concurrent)
-    tasks = [process_user(semaphore, user) for user in need_user_list]
+    semaphore = asyncio.Semaphore(run_config.concurrent_num)
+    # 第一阶段：游戏签到（战双在前，与原顺序一致）
+    tasks = [
+        process_game_user(semaphore, sign_plan, True)
+        for sign_plan in plan.pgr_plans
+    ] + [
+        process_game_user(semaphore, sign_plan, False)
+        for sign_plan in plan.waves_plans
+    ]
     results = await asyncio.gather(*tasks, return_exceptions=True)
-    for result in results:
-        if isinstance(result, Exception):
-            return f"{result.args[0]}"
-
-    # 合并鸣潮和战双的签到消息
-    combined_private_sign_msgs = {}
-    combined_group_sign_msgs = {}
-
-    # 合并私聊消息
-    for qid, msgs in private_waves_sign_msgs.items():
-        combined_private_sign_msgs[qid] = msgs
-
-    for qid, msgs in private_pgr_sign_msgs.items():
-        if qid in combined_private_sign_msgs:
-            combined_private_sign_msgs[qid].extend(msgs)
-        else:
-            combined_private_sign_msgs[qid] = msgs
-
-    # 合并群消息
-    for gid, data in group_waves_sign_msgs.items():
-        combined_group_sign_msgs[gid] = data.copy()
-
-    for gid, data in group_pgr_sign_msgs.items():
-        if gid in combined_group_sign_msgs:
-            combined_group_sign_msgs[gid]["success"] += data["success"]
-            combined_group_sign_msgs[gid]["failed"] += data["failed"]
-            combined_group_sign_msgs[gid]["push_message"].extend(data["push_message"])
-        else:
-            combined_group_sign_msgs[gid] = data.copy()
+    error = next((r for r in results if isinstance(r, Exception)), None)
+
+    # 第二阶段：社区签到
+    if error is None:
+        tasks = [
+            process_bbs_user(semaphore, sign_plan) for sign_plan in plan.bbs_plans
+        ]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        error = next((r for r in results if isinstance(r, Exception)), None)
+
+    # 运行结束，签到状态和失效 cookie 全部落库
+    await sign_buffer.flush()
+    if invalid_cookies:
+        await WavesUser.bulk_update(invalid_cookies)
+        logger.info(f"[自动签到] 标记失效 cookie {len(invalid_cookies)} 个")
+
+    if error is not None:
+        return f"{error.args[0]}"
+
+    if cut_game_user or cut_bbs_user:
+        logger.warning(
+            f"[自动签到] 已超过截止时间，未执行游戏签到: {cut_game_user}，"
+            f"未执行社区签到: {cut_bbs_user}"
+        )
 
     # 游戏签到结果广播（包含鸣潮和战双）
     game_sign_result = await to_board_cast_msg(
-        combined_private_sign_msgs, combined_group_sign_msgs, "游戏签到", theme="blue"
+        game_report.private_msgs,
+        game_report.group_msgs,
+        "游戏签到",
+        theme="blue",
+        run_config=run_config,
     )
-    if not RoverSignConfig.get_config("PrivateSignReport").data:
+    if not run_config.private_report:
         game_sign_result["private_msg_dict"] = {}
-    if not RoverSignConfig.get_config("GroupSignReport").data:
+    if not run_config.group_report:
         game_sign_result["group_msg_dict"] = {}
     await send_board_cast_msg(game_sign_result, BoardcastTypeEnum.SIGN_WAVES)
 
     # 社区签到结果广播
     bbs_result = await to_board_cast_msg(
-        private_bbs_msgs, group_bbs_msgs, "社区签到", theme="yellow"
+        bbs_report.private_msgs,
+        bbs_report.group_msgs,
+        "社区签到",
+        theme="yellow",
+        run_config=run_config,
     )
-    if not RoverSignConfig.get_config("PrivateSignReport").data:
+    if not run_config.private_report:
         bbs_result["private_msg_dict"] = {}
-    if not RoverSignConfig.get_config("GroupSignReport").data:
+    if not run_config.group_report:
         bbs_result["group_msg_dict"] = {}
     await send_board_cast_msg(bbs_result, BoardcastTypeEnum.SIGN_WAVES)
 
     # 构建返回消息
     msg_parts = ["[库洛]自动任务"]
 
-    if all_waves_sign_msgs['success'] > 0:
-        msg_parts.append(f"今日成功鸣潮签到 {all_waves_sign_msgs['success']} 个账号")
+    if game_report.success("waves") > 0:
+        msg_parts.append(f"今日成功鸣潮签到 {game_report.success('waves')} 个账号")
+
+    if game_report.success("pgr") > 0:
+        msg_parts.append(f"今日成功战双签到 {game_report.success('pgr')} 个账号")
+
+    if bbs_report.success("bbs") > 0:
+        msg_parts.append(f"今日社区签到 {bbs_report.success('bbs')} 个账号")
 
-    if all_pgr_sign_msgs['success'] > 0:
-        msg_parts.append(f"今日成功战双签到 {all_pgr_sign_msgs['success']} 个账号")
+    if cut_game_user:
+        msg_parts.append(f"因超时未执行游戏签到 {len(cut_game_user)} 个账号")
 
-    if all_bbs_msgs['success'] > 0:
-        msg_parts.append(f"今日社区签到 {all_bbs_msgs['success']} 个账号")
+    if cut_bbs_user:
+        msg_parts.append(f"因超时未执行社区签到 {len(cut_bbs_user)} 个账号")
+
+    for name, report in (("游戏签到", game_report), ("社区签到", bbs_report)):
+        if report.error_codes:
+            msg_parts.append(f"{name}失败错误码: {report.error_code_text()}")
 
     return "\n".join(msg_parts)
 
 
+async def render_report_card(
+    title: str, theme: str, run_config: RunConfig
+) -> Optional[bytes]:
+    """渲染编码报告卡片，编码失败或超过大小上限时返回 None（改为文字报告）"""
+    fmt = run_config.report_pic_format
+    try:
+        card = await render_pool.run(
+            "sign_card",
+            render_sign_card,
+            title,
+            theme,
+            fmt,
+            run_config.report_pic_quality,
+        )
+    except Exception as e:
+        # 例如 Pillow 未编译 WebP 支持
+        logger.exception(f"[自动签到] 报告卡片 {fmt} 编码失败，改为文字报告", e)
+        return None
+    logger.debug(f"[自动签到] 报告卡片 {fmt} {len(card)} 字节")
+    if run_config.report_pic_max_bytes and len(card) > run_config.report_pic_max_bytes:
+        logger.debug("[自动签到] 报告卡片超过大小上限，改为文字报告")
+        return None
+    return card
+
+
 async def to_board_cast_msg(
     private_msgs,
     group_msgs,
     type: Literal["社区签到", "游戏签到"] = "社区签到",
     theme: str = "yellow",
+    run_config: Optional[RunConfig] = None,
 ):
+    if run_config is None:
+        run_config = RunConfig.load()
+    report_pic = run_config.group_report_pic
+
     # 转为广播消息
     private_msg_dict: Dict[str, List[BoardCastMsg]] = {}
     group_msg_dict: Dict[str, BoardCastMsg] = {}
@@ -546,6 +640,10 @@ async def to_board_cast_msg(
 
     failed_num = 0
     success_num = 0
+    # 报告卡片只随标题变化，相同 (主题, 标题) 的卡片只渲染编码一次
+    # 超过大小上限的卡片记为 None，改为发送文字
+    cards: Dict[Tuple[str, str], Optional[bytes]] = {}
+    upload_bytes = 0
     for gid in group_msgs:
         success = group_msgs[gid]["success"]
         faild = group_msgs[gid]["failed"]
@@ -553,9 +651,18 @@ async def to_board_cast_msg(
         failed_num += int(faild)
         title = f"✅[鸣潮]今日{type}任务已完成！\n本群共签到成功{success}人\n共签到失败{faild}人"
         messages = []
-        if RoverSignConfig.get_config("GroupSignReportPic").data:
-            image = create_sign_info_image(title, theme="yellow")
-            messages.append(MessageSegment.image(image))
+        if report_pic:
+            card_key = ("yellow", title)
+            if card_key not in cards:
+                cards[card_key] = await render_report_card(
+                    title, "yellow", run_config
+                )
+            card = cards[card_key]
+        else:
+            card = None
+        if card is not None:
+            upload_bytes += len(card)
+            messages.append(MessageSegment.image(card))
         else:
             messages.append(MessageSegment.text(title))
         if group_msgs[gid]["push_message"]:
@@ -566,6 +673,12 @@ async def to_board_cast_msg(
             "messages": messages,
         }
 
+    if cards:
+        logger.debug(
+            f"[自动签到] {type}报告卡片 {len(group_msgs)} 个群，渲染 {len(cards)} 张，"
+            f"共发送 {upload_bytes} 字节"
+        )
+
     result: BoardCastMsgDict = {
         "private_msg_dict": private_msg_dict,
         "group_msg_dict": group_msg_dict,
@@ -0,0 +1,144 @@
+from collections import Counter
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Dict, List, Tuple, Optional
+
+from gsuid_core.segment import MessageSegment
+
+from ..utils.errors import ROVER_CODE_999
+
+
+class SignResult(IntEnum):
+    """签到结果类型"""
+
+    SIGNED = 1  # 本次签到成功
+    ALREADY_SIGNED = 2  # 今日已签到
+    SKIPPED = 3  # 无需签到（无角色/无任务/未配置社区任务）
+    FAILED = 4  # 签到失败
+
+
+@dataclass(slots=True)
+class SignOutcome:
+    """单个账号单项签到的结果"""
+
+    result: SignResult
+    msg: str = ""
+    code: int = 0  # 失败时的错误码
+    detail: Optional[Dict[str, bool]] = None  # 社区任务明细
+
+    @classmethod
+    def signed(cls, msg: str = "签到成功！", detail=None) -> "SignOutcome":
+        return cls(SignResult.SIGNED, msg, detail=detail)
+
+    @classmethod
+    def already(cls, msg: str = "今日已签到！请勿重复签到！") -> "SignOutcome":
+        return cls(SignResult.ALREADY_SIGNED, msg)
+
+    @classmethod
+    def skipped(cls, msg: str = "") -> "SignOutcome":
+        """msg 为空时不推送消息"""
+        return cls(SignResult.SKIPPED, msg)
+
+    @classmethod
+    def fail(
+        cls, msg: str = "签到失败！", code: int = ROVER_CODE_999, detail=None
+    ) -> "SignOutcome":
+        return cls(SignResult.FAILED, msg, code, detail)
+
+    @property
+    def ok(self) -> bool:
+        """签到已完成（本次成功或今日已签到）"""
+        return self.result in (SignResult.SIGNED, SignResult.ALREADY_SIGNED)
+
+    @property
+    def is_failed(self) -> bool:
+        return self.result == SignResult.FAILED
+
+
+class SignReport:
+    """签到结果汇总
+
+    计数按账号记录（record），消息按订阅者分发（notify），
+    私聊/群聊消息结构与 to_board_cast_msg 的输入保持一致。
+    success_results 为计入成功数的结果类型：游戏签到只统计本次签到成功，
+    社区签到沿用原逻辑，今日已完成和无需执行的任务也计为成功。
+    """
+
+    __slots__ = (
+        "success_results",
+        "private_msgs",
+        "group_msgs",
+        "counts",
+        "error_codes",
+    )
+
+    def __init__(
+        self, success_results: Tuple[SignResult, ...] = (SignResult.SIGNED,)
+    ):
+        self.success_results = success_results
+        self.private_msgs: Dict[str, List[Dict]] = {}
+        self.group_msgs: Dict[str, Dict] = {}
+        self.counts: Dict[str, Counter] = {}
+        self.error_codes: Counter = Counter()
+
+    def record(self, game: str, outcome: SignOutcome):
+        """记录一次账号签到结果"""
+        self.counts.setdefault(game, Counter())[outcome.result] += 1
+        if outcome.is_failed:
+            self.error_codes[outcome.code] += 1
+
+    def notify(
+        self,
+        bot_id: str,
+        uid: str,
+        gid: str,
+        qid: str,
+        outcome: SignOutcome,
+        group_prefix: str = "",
+    ):
+        """为订阅者添加推送消息"""
+        if not outcome.msg:
+            return
+
+        if gid == "on":
+            self.private_msgs.setdefault(qid, []).append(
+                {
+                    "bot_id": bot_id,
+                    "uid": uid,
+                    "msg": [MessageSegment.text(outcome.msg)],
+                }
+            )
+        elif gid == "off":
+            return
+        else:
+            # 向群消息推送列表添加这个群
+            group = self.group_msgs.setdefault(
+                gid,
+                {
+                    "bot_id": bot_id,
+                    "success": 0,
+                    "failed": 0,
+                    "push_message": [],
+                },
+            )
+            if outcome.is_failed:
+                group["failed"] += 1
+                group["push_message"].extend(
+                    [
+                        MessageSegment.text("\n"),
+                        MessageSegment.at(qid),
+                        MessageSegment.text(f"{group_prefix}{outcome.msg}"),
+                    ]
+                )
+            elif outcome.result in self.success_results:
+                group["success"] += 1
+
+    def success(self, game: str) -> int:
+        counts = self.counts.get(game, Counter())
+        return sum(counts[result] for result in self.success_results)
+
+    def error_code_text(self) -> str:
+        """失败错误码统计文案"""
+        return "、".join(
+            f"{code}×{num}" for code, num in self.error_codes.most_common()
+        )
@@ -0,0 +1,152 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from gsuid_core.logger import logger
+
+from ..roversign_config.run_config import RunConfig
+from ..utils.api.api import PGR_GAME_ID, WAVES_GAME_ID
+from ..utils.database.models import (
+    RoverSign,
+    WavesUser,
+    WavesUserRow,
+    chunked,
+)
+from ..utils.database.states import SignStatus
+
+
+@dataclass
+class SignPlan:
+    """签到执行单元
+
+    同一账号可能被多个 WavesUser 绑定（不同 user_id/bot_id），
+    签到只用 user 这一份凭证执行一次，结果分发给所有 subscribers。
+    """
+
+    user: WavesUserRow  # 执行签到使用的凭证
+    subscribers: List[WavesUserRow] = field(default_factory=list)
+
+    @property
+    def uids(self) -> List[str]:
+        return list(dict.fromkeys(sub.uid for sub in self.subscribers))
+
+
+@dataclass
+class AutoSignPlan:
+    """自动签到计划"""
+
+    waves_plans: List[SignPlan] = field(default_factory=list)
+    pgr_plans: List[SignPlan] = field(default_factory=list)
+    bbs_plans: List[SignPlan] = field(default_factory=list)
+    user_num: int = 0  # 去重前需要签到的绑定数
+
+    def __bool__(self) -> bool:
+        return bool(self.waves_plans or self.pgr_plans or self.bbs_plans)
+
+
+def pick_canonical(users: List[WavesUserRow]) -> WavesUserRow:
+    """选出执行签到的凭证：优先使用未被标记失效的"""
+    for user in users:
+        if not user.status:
+            return user
+    return users[0]
+
+
+def group_by_account(users: List[WavesUserRow]) -> List[List[WavesUserRow]]:
+    """按 cookie 或 uid 相同归为同一库街区账号（并查集）"""
+    parent = list(range(len(users)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    first_seen: Dict[Tuple[str, str], int] = {}
+    for i, user in enumerate(users):
+        uid_key = f"{user.game_id}_{user.uid}"
+        for key in (("cookie", user.cookie), ("uid", uid_key)):
+            if key in first_seen:
+                parent[find(i)] = find(first_seen[key])
+            else:
+                first_seen[key] = i
+
+    groups: Dict[int, List[WavesUserRow]] = {}
+    for i, user in enumerate(users):
+        groups.setdefault(find(i), []).append(user)
+    return list(groups.values())
+
+
+async def build_auto_sign_plan(run_config: RunConfig) -> AutoSignPlan:
+    """构建自动签到计划
+
+    游戏签到按 (uid, game_id) 去重，社区签到按 cookie/uid 归并的账号去重。
+    """
+    plan = AutoSignPlan()
+    if not run_config.auto_sign_enabled:
+        return plan
+
+    bbs_link_config = run_config.bbs_link
+    game_users: Dict[Tuple[str, int], List[WavesUserRow]] = {}
+    bbs_users: List[WavesUserRow] = []
+    need_user_num = 0
+
+    _user_list = [
+        user for user in await WavesUser.get_sign_user_rows() if user.user_id
+    ]
+
+    # 今日签到状态按批一次查出
+    sign_data: Dict[str, RoverSign] = {}
+    for chunk in chunked(list(dict.fromkeys(user.uid for user in _user_list))):
+        sign_data.update(await RoverSign.get_sign_data_by_uids(chunk))
+
+    for user in _user_list:
+        is_signed_waves_game = False
+        is_signed_pgr_game = False
+        is_signed_bbs = False
+        rover_sign = sign_data.get(user.uid)
+        if rover_sign:
+            is_signed_waves_game = SignStatus.waves_game_sign_complete(rover_sign)
+            is_signed_pgr_game = SignStatus.pgr_game_sign_complete(rover_sign)
+            is_signed_bbs = SignStatus.bbs_sign_complete(rover_sign, bbs_link_config)
+
+        if user.game_id == WAVES_GAME_ID:
+            is_signed_game = is_signed_waves_game
+        elif user.game_id == PGR_GAME_ID:
+            is_signed_game = is_signed_pgr_game
+        else:
+            is_signed_game = True
+
+        need_game = (
+            not is_signed_game
+            and run_config.game_sched_enabled
+            and (run_config.signin_master or user.sign_switch != "off")
+        )
+        need_bbs = not is_signed_bbs and (
+            run_config.signin_master
+            or (run_config.bbs_sched_signin and user.bbs_sign_switch != "off")
+        )
+
+        if need_game:
+            game_users.setdefault((user.uid, user.game_id), []).append(user)
+        if need_bbs:
+            bbs_users.append(user)
+        if need_game or need_bbs:
+            need_user_num += 1
+
+    for (_, game_id), users in game_users.items():
+        sign_plan = SignPlan(pick_canonical(users), users)
+        if game_id == PGR_GAME_ID:
+            plan.pgr_plans.append(sign_plan)
+        else:
+            plan.waves_plans.append(sign_plan)
+
+    for users in group_by_account(bbs_users):
+        plan.bbs_plans.append(SignPlan(pick_canonical(users), users))
+
+    plan.user_num = need_user_num
+    logger.info(
+        f"[自动签到] 需要签到的绑定 {need_user_num} 个，去重后"
+        f"鸣潮签到 {len(plan.waves_plans)} 个，战双签到 {len(plan.pgr_plans)} 个，"
+        f"社区签到 {len(plan.bbs_plans)} 个"
+    )
+    return plan
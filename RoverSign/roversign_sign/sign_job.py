@@ -0,0 +1,89 @@
+import asyncio
+from typing import Set, List, Tuple
+
+from gsuid_core.bot import Bot
+from gsuid_core.logger import logger
+from gsuid_core.models import Event
+
+from ..roversign_config.run_config import RunConfig
+from .new_sign import load_user_sign_state, rover_sign_up_handler
+
+# 后台签到的工作协程数量
+SIGN_JOB_WORKERS = 2
+# 排队中的后台签到上限，超出时提示稍后再试
+SIGN_JOB_QUEUE_SIZE = 64
+
+# 排队或进行中的后台签到 (user_id, bot_id)
+_SIGN_JOB_KEYS: Set[Tuple[str, str]] = set()
+_sign_job_queue: "asyncio.Queue[Tuple[Bot, Event]]" = asyncio.Queue(
+    SIGN_JOB_QUEUE_SIZE
+)
+_sign_job_workers: List[asyncio.Task] = []
+
+
+async def _run_sign_job(bot: Bot, ev: Event):
+    """后台执行签到，完成后推送结果"""
+    try:
+        msg = await rover_sign_up_handler(bot, ev)
+    except Exception as e:
+        logger.exception(f"[RoverSign] [后台签到] {ev.user_id} 签到失败", e)
+        msg = "签到执行失败，请稍后再试"
+
+    if ev.group_id:
+        await bot.target_send(msg, "group", ev.group_id)
+    else:
+        await bot.target_send(msg, "direct", ev.user_id)
+
+
+async def _sign_job_worker():
+    while True:
+        bot, ev = await _sign_job_queue.get()
+        try:
+            await _run_sign_job(bot, ev)
+        except Exception as e:
+            logger.exception(f"[RoverSign] [后台签到] {ev.user_id} 推送结果失败", e)
+        finally:
+            _SIGN_JOB_KEYS.discard((ev.user_id, ev.bot_id))
+            _sign_job_queue.task_done()
+
+
+def _ensure_workers():
+    _sign_job_workers[:] = [task for task in _sign_job_workers if not task.done()]
+    while len(_sign_job_workers) < SIGN_JOB_WORKERS:
+        _sign_job_workers.append(asyncio.create_task(_sign_job_worker()))
+
+
+async def submit_sign_job(bot: Bot, ev: Event) -> str:
+    """立即返回本地签到状态，未完成的签到放到后台队列执行"""
+    state = await load_user_sign_state(ev, RunConfig.load())
+    if isinstance(state, str):
+        return state
+
+    if state.all_completed:
+        return state.status_msg(skip=True)
+
+    msg = state.status_msg()
+    key = (ev.user_id, ev.bot_id)
+    if key in _SIGN_JOB_KEYS:
+        return f"{msg}\n签到正在进行中，完成后将推送结果"
+
+    try:
+        _sign_job_queue.put_nowait((bot, ev))
+    except asyncio.QueueFull:
+        return f"{msg}\n当前签到人数较多，请稍后再试"
+    _SIGN_JOB_KEYS.add(key)
+    _ensure_workers()
+    return f"{msg}\n已开始签到，完成后将推送结果"
+
+
+async def shutdown_sign_jobs():
+    """停止后台签到，丢弃仍在排队的任务"""
+    while not _sign_job_queue.empty():
+        _sign_job_queue.get_nowait()
+        _sign_job_queue.task_done()
+    _SIGN_JOB_KEYS.clear()
+
+    workers, _sign_job_workers[:] = list(_sign_job_workers), []
+    for task in workers:
+        task.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
@@ -1,28 +1,34 @@
 from gsuid_core.status.plugin_status import register_status
 
 from ..utils.database.models import RoverSign, WavesUser
+from ..utils.database.counter import (
+    SIGN_ENABLED_KEY,
+    counter_cache,
+    sign_date_key,
+)
 from ..utils.image import get_ICON
-from ..utils.util import get_yesterday_date
+from ..utils.util import get_today_date, get_yesterday_date
 
 
 async def get_sign_num():
-    datas = await WavesUser.get_waves_all_user()
-    num = 0
-    for data in datas:
-        if data.sign_switch != "off":
-            num += 1
-    return num
+    return await counter_cache.get(
+        SIGN_ENABLED_KEY, WavesUser.count_sign_enabled
+    )
 
 
 async def get_today_sign_num():
-    datas = await RoverSign.get_all_sign_data_by_date()
-    return len(datas)
+    today = get_today_date()
+    return await counter_cache.get(
+        sign_date_key(today), lambda: RoverSign.count_sign_data_by_date(today)
+    )
 
 
 async def get_yesterday_sign_num():
     yesterday = get_yesterday_date()
-    datas = await RoverSign.get_all_sign_data_by_date(date=yesterday)
-    return len(datas)
+    return await counter_cache.get(
+        sign_date_key(yesterday),
+        lambda: RoverSign.count_sign_data_by_date(date=yesterday),
+    )
 
 
 register_status(
@@ -35,8 +35,9 @@ from ..api.api import (
     get_local_proxy_url,
     get_need_proxy_func,
 )
-from ..database.models import WavesUser
+from ..database.models import WavesUser, WavesUserRow
 from ..errors import ROVER_CODE_999
+from ..rate_limiter import request_slot
 from ..util import timed_async_cache
 from .request_util import KURO_VERSION, KuroApiResp, get_base_header
 
@@ -62,7 +63,9 @@ class RoverRequest:
             return SERVER_ID
         return ""
 
-    async def refresh_bat_token(self, waves_user: WavesUser):
+    async def refresh_bat_token(
+        self, waves_user: Union[WavesUser, WavesUserRow]
+    ):
         success, access_token = await self.get_request_token(
             waves_user.uid,
             waves_user.cookie,
@@ -427,33 +430,35 @@ class RoverRequest:
 
         for attempt in range(max_retries):
             try:
-                async with ClientSession(
-                    connector=TCPConnector(verify_ssl=self.ssl_verify)
-                ) as client:
-                    async with client.request(
-                        method,
-                        url=url,
-                        headers=header,
-                        params=params,
-                        json=json_data,
-                        data=data,
-                        proxy=proxy_url,
-                        timeout=ClientTimeout(10),
-                    ) as resp:
-                        try:
-                            raw_data = await resp.json()
-                        except ContentTypeError:
-                            _raw_data = await resp.text()
-                            raw_data = {"code": ROVER_CODE_999, "data": _raw_data}
-                        if isinstance(raw_data, dict):
+                # 每次请求都经过当前的限速器，重试等待不占用并发名额
+                async with request_slot():
+                    async with ClientSession(
+                        connector=TCPConnector(verify_ssl=self.ssl_verify)
+                    ) as client:
+                        async with client.request(
+                            method,
+                            url=url,
+                            headers=header,
+                            params=params,
+                            json=json_data,
+                            data=data,
+                            proxy=proxy_url,
+                            timeout=ClientTimeout(10),
+                        ) as resp:
                             try:
-                                raw_data["data"] = json.loads(raw_data.get("data", ""))
-                            except Exception:
-                                pass
-                        logger.debug(
-                            f"url:[{url}] params:[{params}] headers:[{header}] data:[{data}] raw_data:{raw_data}"
-                        )
-                        return KuroApiResp[Any].model_validate(raw_data)
+                                raw_data = await resp.json()
+                            except ContentTypeError:
+                                _raw_data = await resp.text()
+                                raw_data = {"code": ROVER_CODE_999, "data": _raw_data}
+                            if isinstance(raw_data, dict):
+                                try:
+                                    raw_data["data"] = json.loads(raw_data.get("data", ""))
+                                except Exception:
+                                    pass
+                            logger.debug(
+                                f"url:[{url}] params:[{params}] headers:[{header}] data:[{data}] raw_data:{raw_data}"
+                            )
+                            return KuroApiResp[Any].model_validate(raw_data)
             except Exception as e:
                 logger.exception(f"url:[{url}] attempt {attempt + 1} failed", e)
                 if attempt < max_retries - 1:
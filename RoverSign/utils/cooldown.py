@@ -0,0 +1,51 @@
+import time
+from typing import Awaitable, Callable, Dict, Generic, Hashable, Tuple, TypeVar
+
+from .single_flight import SingleFlight
+
+T = TypeVar("T")
+
+
+class CommandCooldown(Generic[T]):
+    """指令冷却缓存
+
+    同一 key 在冷却时间内重复触发时直接返回上次结果；
+    上次执行尚未结束时，后来者等待并共享同一个结果。
+    无论消息来得多频繁，每个 key 在每个冷却窗口内最多执行一次。
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._cache: Dict[Hashable, Tuple[float, T]] = {}
+        self._flight: SingleFlight[T] = SingleFlight()
+
+    async def run(
+        self, key: Hashable, window: float, func: Callable[[], Awaitable[T]]
+    ) -> T:
+        if window > 0 and key in self._cache:
+            timestamp, value = self._cache[key]
+            if time.monotonic() - timestamp < window:
+                return value
+
+        async def call() -> T:
+            value = await func()
+            if window > 0:
+                self._store(key, value, window)
+            return value
+
+        return await self._flight.run(key, call)
+
+    def _store(self, key: Hashable, value: T, window: float):
+        now = time.monotonic()
+        if len(self._cache) >= self.max_size:
+            # 清理已过期的缓存
+            self._cache = {
+                k: v for k, v in self._cache.items() if now - v[0] < window
+            }
+        while len(self._cache) >= self.max_size:
+            # 仍然过多时淘汰最早的缓存
+            self._cache.pop(next(iter(self._cache)))
+        self._cache[key] = (now, value)
+
+    def clear(self, key: Hashable):
+        self._cache.pop(key, None)
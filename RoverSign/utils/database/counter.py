@@ -0,0 +1,48 @@
+import time
+from typing import Dict, Tuple, Callable, Hashable, Awaitable
+
+
+def sign_date_key(date: str) -> Tuple[str, str]:
+    """某日签到记录数的缓存键"""
+    return ("sign_date", date)
+
+
+SIGN_ENABLED_KEY = ("sign_enabled",)
+
+
+class CounterCache:
+    """计数缓存
+
+    计数结果缓存 ttl 秒，过期后重新执行 COUNT 查询；
+    写入数据时通过 incr 同步更新已缓存的计数，避免状态页读到明显滞后的值。
+    """
+
+    def __init__(self, ttl: float = 60):
+        self.ttl = ttl
+        self._values: Dict[Hashable, Tuple[float, int]] = {}
+
+    def cached(self, key: Hashable) -> bool:
+        item = self._values.get(key)
+        return item is not None and time.monotonic() - item[0] < self.ttl
+
+    async def get(self, key: Hashable, loader: Callable[[], Awaitable[int]]) -> int:
+        if self.cached(key):
+            return self._values[key][1]
+        value = await loader()
+        self._values[key] = (time.monotonic(), value)
+        return value
+
+    def incr(self, key: Hashable, n: int = 1):
+        """已缓存时累加，未缓存时等下次查询"""
+        if n and self.cached(key):
+            timestamp, value = self._values[key]
+            self._values[key] = (timestamp, value + n)
+
+    def invalidate(self, key: Hashable):
+        self._values.pop(key, None)
+
+    def clear(self):
+        self._values.clear()
+
+
+counter_cache = CounterCache()
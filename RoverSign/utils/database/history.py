@@ -0,0 +1,138 @@
+from typing import Any, Dict, List, Type, Tuple, TypeVar, Optional
+
+from sqlmodel import Field, SQLModel, col, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from gsuid_core.logger import logger
+from gsuid_core.utils.database.base_models import with_session
+
+from .states import SignStatus
+from .models import RoverSign, chunked
+
+T_RoverSignHistory = TypeVar("T_RoverSignHistory", bound="RoverSignHistory")
+
+# 历史中记录的签到项及其完成条件
+HISTORY_FIELDS: Dict[str, int] = {
+    "game_sign": SignStatus.GAME_SIGN,
+    "pgr_game_sign": SignStatus.PGR_GAME_SIGN,
+    "bbs_sign": SignStatus.BBS_SIGN,
+    "bbs_detail": SignStatus.BBS_DETAIL,
+    "bbs_like": SignStatus.BBS_LIKE,
+    "bbs_share": SignStatus.BBS_SHARE,
+}
+
+# 每批汇总的签到记录数
+ROLLUP_CHUNK_SIZE = 1000
+
+
+def day_bit(date: str) -> int:
+    """日期 YYYY-MM-DD 在月位图中对应的位"""
+    return 1 << (int(date[8:10]) - 1)
+
+
+class RoverSignHistory(SQLModel, table=True):
+    """
+    签到历史（每个账号每月一行）
+    每个签到项是一个位图，第 n 位表示当月 n+1 日已完成
+    """
+
+    __table_args__: Dict[str, Any] = {"extend_existing": True}
+    uid: str = Field(primary_key=True, title="鸣潮UID")
+    month: str = Field(primary_key=True, title="月份")
+    game_sign: int = Field(default=0, title="游戏签到（鸣潮）")
+    pgr_game_sign: int = Field(default=0, title="游戏签到（战双）")
+    bbs_sign: int = Field(default=0, title="社区签到")
+    bbs_detail: int = Field(default=0, title="社区浏览")
+    bbs_like: int = Field(default=0, title="社区点赞")
+    bbs_share: int = Field(default=0, title="社区分享")
+
+    def signed_days(self, field: str = "game_sign") -> List[int]:
+        """当月已完成某签到项的日期"""
+        bitmap = getattr(self, field)
+        return [day + 1 for day in range(31) if bitmap >> day & 1]
+
+    @classmethod
+    @with_session
+    async def get_history(
+        cls: Type[T_RoverSignHistory],
+        session: AsyncSession,
+        uid: str,
+        month: Optional[str] = None,
+    ) -> List[T_RoverSignHistory]:
+        """查询签到历史，不指定月份时返回全部月份"""
+        sql = select(cls).where(cls.uid == uid)
+        if month:
+            sql = sql.where(cls.month == month)
+        result = await session.execute(sql.order_by(col(cls.month)))
+        return list(result.scalars().all())
+
+    @classmethod
+    async def rollup(cls, date: str) -> int:
+        """
+        将 date 及之前的签到记录汇总进历史
+        按主键分批处理，重复汇总同一天的记录不会改变结果，返回处理的记录数
+        """
+        last_id = 0
+        total = 0
+        while True:
+            last_id, count = await cls._rollup_chunk(date, last_id)
+            total += count
+            if count < ROLLUP_CHUNK_SIZE:
+                break
+        logger.info(f"[RoverSign] [签到历史] 已汇总 {total} 条签到记录")
+        return total
+
+    @classmethod
+    @with_session
+    async def _rollup_chunk(
+        cls: Type[T_RoverSignHistory],
+        session: AsyncSession,
+        date: str,
+        last_id: int,
+    ) -> Tuple[int, int]:
+        sql = (
+            select(
+                RoverSign.id,
+                RoverSign.uid,
+                RoverSign.date,
+                *(getattr(RoverSign, field) for field in HISTORY_FIELDS),
+            )
+            .where(RoverSign.date <= date)
+            .where(col(RoverSign.id) > last_id)
+            .order_by(col(RoverSign.id))
+            .limit(ROLLUP_CHUNK_SIZE)
+        )
+        rows = (await session.execute(sql)).all()
+        if not rows:
+            return last_id, 0
+
+        # (uid, month) -> 签到项 -> 位图
+        bitmaps: Dict[Tuple[str, str], Dict[str, int]] = {}
+        for row in rows:
+            bits = bitmaps.setdefault((row.uid, row.date[:7]), {})
+            bit = day_bit(row.date)
+            for field, complete in HISTORY_FIELDS.items():
+                if getattr(row, field) == complete:
+                    bits[field] = bits.get(field, 0) | bit
+
+        records: Dict[Tuple[str, str], T_RoverSignHistory] = {}
+        for month in {month for _, month in bitmaps}:
+            uids = [uid for uid, m in bitmaps if m == month]
+            for chunk in chunked(uids):
+                sql = (
+                    select(cls)
+                    .where(col(cls.uid).in_(chunk))
+                    .where(cls.month == month)
+                )
+                for record in (await session.execute(sql)).scalars().all():
+                    records[(record.uid, record.month)] = record
+
+        for (uid, month), bits in bitmaps.items():
+            record = records.get((uid, month))
+            if record is None:
+                session.add(cls(uid=uid, month=month, **bits))
+                continue
+            for field, bit in bits.items():
+                setattr(record, field, getattr(record, field) | bit)
+
+        return rows[-1].id, len(rows)
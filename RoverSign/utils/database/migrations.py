@@ -0,0 +1,174 @@
+from dataclasses import dataclass
+from typing import Any, Dict, List, Callable, Optional
+
+from sqlalchemy import Index, Table, func, text, inspect
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.schema import CreateColumn
+from sqlmodel import Field, SQLModel, select
+
+from gsuid_core.logger import logger
+
+from .history import RoverSignHistory
+from .models import SIGN_FIELDS, RoverSign, WavesUser, RoverSignLease
+
+# 记录在版本表中的名称
+SCHEMA_NAME = "RoverSign"
+
+
+class RoverSignSchema(SQLModel, table=True):
+    """RoverSign 数据表结构版本"""
+
+    __table_args__: Dict[str, Any] = {"extend_existing": True}
+    name: str = Field(primary_key=True, title="名称")
+    version: int = Field(default=0, title="版本")
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    upgrade: Callable[[Connection], None]
+
+
+def add_column(conn: Connection, table: Table, column: str, default: str = ""):
+    """
+    字段不存在时按模型中的定义添加
+    表名、字段名和类型由当前数据库方言生成，default 为 SQL 默认值表达式
+    """
+    columns = {c["name"] for c in inspect(conn).get_columns(table.name)}
+    if column in columns:
+        return
+    preparer = conn.dialect.identifier_preparer
+    column_ddl = CreateColumn(table.c[column]).compile(dialect=conn.dialect)
+    ddl = f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {column_ddl}"
+    if default:
+        ddl += f" DEFAULT {default}"
+    conn.execute(text(ddl))
+
+
+def create_index(conn: Connection, table, name: str):
+    """按模型中声明的索引创建，已存在时跳过"""
+    index: Index = next(i for i in table.indexes if i.name == name)
+    index.create(conn, checkfirst=True)
+
+
+def _v1_pgr_columns(conn: Connection):
+    table = RoverSign.__table__
+    add_column(conn, table, "pgr_uid", "''")
+    add_column(conn, table, "pgr_game_sign", "0")
+
+
+def _v2_rover_sign_index(conn: Connection):
+    # (uid, date) 唯一，先清理重复记录，保留最新的一条
+    table = RoverSign.__table__
+    # 重复记录中可能有当天已完成的签到状态，先把各字段的最大值合并到保留的记录
+    merge_fields = ("pgr_uid",) + SIGN_FIELDS
+    duplicates = (
+        select(
+            func.max(table.c.id).label("id"),
+            *(func.max(table.c[field]).label(field) for field in merge_fields),
+        )
+        .group_by(table.c.uid, table.c.date)
+        .having(func.count() > 1)
+    )
+    for row in conn.execute(duplicates).mappings().all():
+        conn.execute(
+            table.update()
+            .where(table.c.id == row["id"])
+            .values(**{field: row[field] for field in merge_fields})
+        )
+
+    # 多包一层子查询，MySQL 不允许删除时直接查询同一张表
+    keep = (
+        select(func.max(table.c.id).label("id"))
+        .group_by(table.c.uid, table.c.date)
+        .subquery("t")
+    )
+    conn.execute(table.delete().where(table.c.id.not_in(select(keep.c.id))))
+    create_index(conn, table, "ix_roversign_uid_date")
+
+
+def _v3_waves_user_index(conn: Connection):
+    for name in (
+        "ix_wavesuser_cookie",
+        "ix_wavesuser_cookie_uid_game_id",
+        "ix_wavesuser_user_id_uid_bot_id",
+    ):
+        create_index(conn, WavesUser.__table__, name)
+
+
+def _v4_sign_history(conn: Connection):
+    RoverSignHistory.__table__.create(conn, checkfirst=True)  # type: ignore
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "RoverSign 添加战双字段", _v1_pgr_columns),
+    Migration(2, "RoverSign (uid, date) 唯一索引", _v2_rover_sign_index),
+    Migration(3, "WavesUser 查询索引", _v3_waves_user_index),
+    Migration(4, "签到历史表", _v4_sign_history),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+async def get_schema_version(engine: AsyncEngine) -> int:
+    async with engine.connect() as conn:
+        result = await conn.execute(
+            select(RoverSignSchema.version).where(
+                RoverSignSchema.name == SCHEMA_NAME
+            )
+        )
+        return result.scalar() or 0
+
+
+async def run_migrations(engine: Optional[AsyncEngine] = None) -> int:
+    """
+    按版本顺序执行未应用的迁移，返回当前版本
+    每个迁移在独立事务中执行，成功后记录版本；失败时停止，下次启动重试
+    """
+    if engine is None:
+        from gsuid_core.utils.database.base_models import engine
+
+    async with engine.begin() as conn:
+        await conn.run_sync(
+            SQLModel.metadata.create_all,
+            tables=[
+                RoverSignSchema.__table__,
+                RoverSign.__table__,
+                RoverSignLease.__table__,
+                RoverSignHistory.__table__,
+            ],
+        )
+
+    version = await get_schema_version(engine)
+    for migration in MIGRATIONS:
+        if migration.version <= version:
+            continue
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(migration.upgrade)
+                await conn.run_sync(_set_version, migration.version)
+        except Exception as e:
+            logger.exception(
+                f"[RoverSign] 数据库迁移 v{migration.version} "
+                f"{migration.description} 失败",
+                e,
+            )
+            break
+        version = migration.version
+        logger.info(
+            f"[RoverSign] 数据库迁移 v{version} {migration.description} 完成"
+        )
+    return version
+
+
+def _set_version(conn: Connection, version: int):
+    table = RoverSignSchema.__table__
+    updated = conn.execute(
+        table.update()
+        .where(table.c.name == SCHEMA_NAME)
+        .values(version=version)
+    )
+    if not updated.rowcount:
+        conn.execute(table.insert().values(name=SCHEMA_NAME, version=version))
@@ -1,46 +1,106 @@
+import time
 import asyncio
+import inspect
 from functools import wraps
-from typing import Any, Dict, List, Optional, Type, TypeVar
+from dataclasses import replace, dataclass
+from contextlib import AsyncExitStack
+from typing import (
+    Any,
+    Dict,
+    List,
+    Type,
+    Tuple,
+    TypeVar,
+    Callable,
+    Hashable,
+    Iterable,
+    Optional,
+    Sequence,
+)
 
-from pydantic import BaseModel
-from sqlalchemy import delete, null, update
+from sqlalchemy import Index, or_, bindparam, delete, func, null, update
+from sqlalchemy import inspect as sa_inspect
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlmodel import Field, col, select
+from sqlmodel import Field, SQLModel, col, select
 
+from gsuid_core.logger import logger
 from gsuid_core.utils.database.base_models import (
     BaseIDModel,
     Bind,
     User,
     with_session,
 )
-from gsuid_core.utils.database.startup import exec_list
 
 from ..util import get_today_date
+from .counter import counter_cache, sign_date_key
 
-# 添加数据库字段迁移
-exec_list.extend(
-    [
-        'ALTER TABLE RoverSign ADD COLUMN pgr_uid TEXT DEFAULT ""',
-        'ALTER TABLE RoverSign ADD COLUMN pgr_game_sign INTEGER DEFAULT 0',
-    ]
-)
+# 数据库字段和索引迁移见 migrations.py
+
+# 批量写入时每条语句的最大行数
+BULK_CHUNK_SIZE = 500
+# 清理签到记录时每批删除的行数，以及批次之间的间隔（秒）
+PURGE_CHUNK_SIZE = 500
+PURGE_PAUSE = 0.05
+
+# 数据库写锁分段：按账号 uid 散列到不同的锁，不同账号的写入互不等待
+LOCK_STRIPES = 16
+_DB_WRITE_LOCKS = [asyncio.Lock() for _ in range(LOCK_STRIPES)]
+
+
+def get_write_locks(keys: Iterable[Hashable]) -> List[asyncio.Lock]:
+    """返回 keys 对应的写锁，按固定顺序排列避免死锁"""
+    stripes = sorted({hash(key) % LOCK_STRIPES for key in keys if key})
+    return [_DB_WRITE_LOCKS[i] for i in stripes]
 
-# 创建一个全局的数据库写锁
-_DB_WRITE_LOCK = asyncio.Lock()
 
+def with_lock(key_func: Callable[[Dict[str, Any]], Iterable[Hashable]]):
+    """
+    按 key_func 给出的键加写锁
+    key_func 接收方法的参数字典（参数名 -> 值），返回需要加锁的键
+    """
 
-def with_lock(func):
-    @wraps(func)
-    async def wrapper(*args, **kwargs):
-        async with _DB_WRITE_LOCK:
-            return await func(*args, **kwargs)
+    def decorator(func):
+        signature = inspect.signature(func)
 
-    return wrapper
+        @wraps(func)
+        async def wrapper(cls, *args, **kwargs):
+            # with_session 注入的 session 参数在此处占位
+            arguments = signature.bind_partial(cls, None, *args, **kwargs)
+            async with AsyncExitStack() as stack:
+                for lock in get_write_locks(key_func(arguments.arguments)):
+                    await stack.enter_async_context(lock)
+                return await func(cls, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
 
 
 T_WavesBind = TypeVar("T_WavesBind", bound="WavesBind")
 T_WavesUser = TypeVar("T_WavesUser", bound="WavesUser")
 T_RoverSign = TypeVar("T_RoverSign", bound="RoverSign")
+T_RoverSignLease = TypeVar("T_RoverSignLease", bound="RoverSignLease")
+
+
+def chunked(items: Sequence, size: int = BULK_CHUNK_SIZE) -> Iterable[Sequence]:
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+@dataclass(slots=True)
+class WavesUserRow:
+    """调度用的轻量用户行，只包含签到需要的字段，不经过 ORM"""
+
+    uid: str
+    user_id: str
+    bot_id: str
+    cookie: str
+    status: Optional[str]
+    game_id: int
+    sign_switch: str
+    bbs_sign_switch: str
+    did: str
+    bat: str
 
 
 class WavesBind(Bind, table=True):
@@ -50,7 +110,12 @@ class WavesBind(Bind, table=True):
 
 
 class WavesUser(User, table=True):
-    __table_args__: Dict[str, Any] = {"extend_existing": True}
+    __table_args__ = (
+        Index("ix_wavesuser_cookie", "cookie"),
+        Index("ix_wavesuser_cookie_uid_game_id", "cookie", "uid", "game_id"),
+        Index("ix_wavesuser_user_id_uid_bot_id", "user_id", "uid", "bot_id"),
+        {"extend_existing": True},
+    )
     cookie: str = Field(default="", title="Cookie")
     uid: str = Field(default=None, title="鸣潮UID")
     record_id: Optional[str] = Field(default=None, title="记录ID")
@@ -62,7 +127,7 @@ class WavesUser(User, table=True):
     game_id: int = Field(default=3, title="GameID")
 
     @classmethod
-    @with_lock
+    @with_lock(lambda a: [a["uid"]])
     @with_session
     async def mark_cookie_invalid(
         cls: Type[T_WavesUser], session: AsyncSession, uid: str, cookie: str, mark: str
@@ -76,6 +141,41 @@ class WavesUser(User, table=True):
         await session.execute(sql)
         return True
 
+    @classmethod
+    @with_lock(lambda a: [row.get("uid") for row in a["rows"]])
+    @with_session
+    async def bulk_update(
+        cls: Type[T_WavesUser],
+        session: AsyncSession,
+        rows: List[Dict[str, Any]],
+        keys: Tuple[str, ...] = ("uid", "cookie"),
+    ) -> int:
+        """
+        批量更新数据
+        rows 中每项包含 keys 指定的定位字段和需要更新的字段，
+        更新字段相同的行合并为一条 executemany 语句
+        """
+        table = cls.__table__  # type: ignore
+        groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        for row in rows:
+            fields = tuple(sorted(k for k in row if k not in keys))
+            if not fields:
+                continue
+            # 定位字段改名，避免与 SET 子句的参数重名
+            groups.setdefault(fields, []).append(
+                {f"_{k}" if k in keys else k: v for k, v in row.items()}
+            )
+
+        count = 0
+        for params in groups.values():
+            sql = update(table)
+            for key in keys:
+                sql = sql.where(table.c[key] == bindparam(f"_{key}"))
+            for chunk in chunked(params):
+                await session.execute(sql, list(chunk))
+                count += len(chunk)
+        return count
+
     @classmethod
     @with_session
     async def select_cookie(
@@ -154,6 +254,50 @@ class WavesUser(User, table=True):
         data = result.scalars().all()
         return list(data)
 
+    @classmethod
+    @with_session
+    async def count_sign_enabled(
+        cls: Type[T_WavesUser],
+        session: AsyncSession,
+    ) -> int:
+        """
+        统计开启了自动签到的玩家数
+        """
+        sql = (
+            select(func.count())
+            .select_from(cls)
+            .where(cls.cookie != null())
+            .where(cls.cookie != "")
+            .where(cls.user_id != null())
+            .where(cls.user_id != "")
+            .where(
+                or_(col(cls.sign_switch).is_(None), cls.sign_switch != "off")
+            )
+        )
+        result = await session.execute(sql)
+        return result.scalar() or 0
+
+    @classmethod
+    @with_session
+    async def get_sign_user_rows(
+        cls: Type[T_WavesUser],
+        session: AsyncSession,
+    ) -> List[WavesUserRow]:
+        """
+        获取有cookie的玩家（只查询签到需要的字段）
+        """
+        sql = (
+            select(
+                *(getattr(cls, name) for name in WavesUserRow.__slots__)
+            )
+            .where(cls.cookie != null())
+            .where(cls.cookie != "")
+            .where(cls.user_id != null())
+            .where(cls.user_id != "")
+        )
+        result = await session.execute(sql)
+        return [WavesUserRow(*row) for row in result.all()]
+
     @classmethod
     @with_session
     async def select_data_by_cookie_and_uid(
@@ -172,7 +316,29 @@ class WavesUser(User, table=True):
         return data[0] if data else None
 
 
-class RoverSignData(BaseModel):
+SIGN_FIELDS = (
+    "game_sign",
+    "pgr_game_sign",
+    "bbs_sign",
+    "bbs_detail",
+    "bbs_like",
+    "bbs_share",
+)
+
+# (uid, date) 唯一索引是否存在，每个进程只检查一次
+_UNIQUE_INDEX_READY: Optional[bool] = None
+
+# 社区任务状态字段
+BBS_FIELDS = SIGN_FIELDS[2:]
+
+
+@dataclass(slots=True)
+class RoverSignData:
+    """
+    签到过程中的状态
+    非空字段表示需要写入的值，空字段表示保持数据库中的原值
+    """
+
     uid: str  # 鸣潮UID
     pgr_uid: Optional[str] = None  # 战双UID
     date: Optional[str] = None  # 签到日期
@@ -183,6 +349,54 @@ class RoverSignData(BaseModel):
     bbs_like: Optional[int] = None  # 社区点赞
     bbs_share: Optional[int] = None  # 社区分享
 
+    def merge(self, other: "RoverSignData"):
+        """合并另一份签到数据，other 中非空字段覆盖当前值"""
+        for field in SIGN_FIELDS:
+            value = getattr(other, field)
+            if value is not None:
+                setattr(self, field, value)
+        if other.pgr_uid:
+            self.pgr_uid = other.pgr_uid
+
+    def apply_to(self, record):
+        """将非空字段写入签到记录"""
+        for field in SIGN_FIELDS:
+            value = getattr(self, field)
+            if value is not None:
+                setattr(record, field, value)
+        if self.pgr_uid:
+            record.pgr_uid = self.pgr_uid
+
+    def with_date(self, date: str) -> "RoverSignData":
+        """返回指定日期的副本"""
+        return replace(self, date=date)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """非空字段，用于创建签到记录"""
+        result = {}
+        for name in self.__slots__:
+            value = getattr(self, name)
+            if value is not None:
+                result[name] = value
+        return result
+
+    @classmethod
+    def from_record(cls, record) -> "RoverSignData":
+        """从签到记录创建"""
+        return cls(**{name: getattr(record, name, None) for name in cls.__slots__})
+
+    @classmethod
+    def bbs_state_of(cls, record) -> "RoverSignData":
+        """
+        只取记录中的社区任务状态
+        签到记录可能是任务开始前读取的，游戏签到状态已过期，不能一起写回
+        """
+        return cls(
+            uid=record.uid,
+            date=getattr(record, "date", None),
+            **{field: getattr(record, field) for field in BBS_FIELDS},
+        )
+
     @classmethod
     def build(cls, uid: str, pgr_uid: Optional[str] = None):
         date = get_today_date()
@@ -209,9 +423,24 @@ class RoverSignData(BaseModel):
             bbs_share=0,
         )
 
+    @classmethod
+    def build_bbs_complete(cls, uid: str):
+        from .states import SignStatus
+
+        return cls(
+            uid=uid,
+            bbs_sign=SignStatus.BBS_SIGN,
+            bbs_detail=SignStatus.BBS_DETAIL,
+            bbs_like=SignStatus.BBS_LIKE,
+            bbs_share=SignStatus.BBS_SHARE,
+        )
+
 
 class RoverSign(BaseIDModel, table=True):
-    __table_args__: Dict[str, Any] = {"extend_existing": True}
+    __table_args__ = (
+        Index("ix_roversign_uid_date", "uid", "date", unique=True),
+        {"extend_existing": True},
+    )
     uid: str = Field(title="鸣潮UID")
     pgr_uid: Optional[str] = Field(default=None, title="战双UID")
     game_sign: int = Field(default=0, title="游戏签到（鸣潮）")
@@ -235,17 +464,12 @@ class RoverSign(BaseIDModel, table=True):
         return result.scalars().first()
 
     @classmethod
-    @with_lock
-    @with_session
-    async def upsert_rover_sign(
+    async def _upsert(
         cls: Type[T_RoverSign],
         session: AsyncSession,
         rover_sign_data: RoverSignData,
     ) -> Optional[T_RoverSign]:
-        """
-        插入或更新签到数据
-        返回更新后的记录或新插入的记录
-        """
+        """在给定会话中插入或更新签到数据（内部方法）"""
         if not rover_sign_data.uid:
             return None
 
@@ -259,28 +483,184 @@ class RoverSign(BaseIDModel, table=True):
 
         if record:
             # 更新已有记录
-            for field in [
-                "game_sign",
-                "pgr_game_sign",
-                "bbs_sign",
-                "bbs_detail",
-                "bbs_like",
-                "bbs_share",
-            ]:
-                value = getattr(rover_sign_data, field)
-                if value is not None:
-                    setattr(record, field, value)
-            # 更新 pgr_uid
-            if rover_sign_data.pgr_uid:
-                record.pgr_uid = rover_sign_data.pgr_uid
+            rover_sign_data.apply_to(record)
             result = record
         else:
-            # 添加新记录 - 直接从Pydantic模型创建SQLModel实例
-            result = cls(**rover_sign_data.model_dump())
+            # 添加新记录
+            result = cls(**rover_sign_data.to_dict())
             session.add(result)
+            counter_cache.incr(sign_date_key(rover_sign_data.date))
 
         return result
 
+    @classmethod
+    @with_lock(lambda a: [a["rover_sign_data"].uid])
+    @with_session
+    async def upsert_rover_sign(
+        cls: Type[T_RoverSign],
+        session: AsyncSession,
+        rover_sign_data: RoverSignData,
+    ) -> Optional[T_RoverSign]:
+        """
+        插入或更新签到数据
+        返回更新后的记录或新插入的记录
+        """
+        return await cls._upsert(session, rover_sign_data)
+
+    @classmethod
+    @with_lock(lambda a: [data.uid for data in a["rover_sign_list"]])
+    @with_session
+    async def bulk_upsert(
+        cls: Type[T_RoverSign],
+        session: AsyncSession,
+        rover_sign_list: List[RoverSignData],
+    ) -> int:
+        """
+        批量插入或更新签到数据（一个事务）
+        SQLite/PostgreSQL/MySQL 使用原生 upsert，其他数据库或缺少唯一索引时分批查询后写入
+        """
+        # 同一 (uid, date) 先在内存中合并
+        merged: Dict[Tuple[str, str], RoverSignData] = {}
+        for data in rover_sign_list:
+            if not data.uid:
+                continue
+            date = data.date or get_today_date()
+            key = (data.uid, date)
+            if key in merged:
+                merged[key].merge(data)
+            else:
+                merged[key] = data.with_date(date)
+        if not merged:
+            return 0
+
+        dialect = session.get_bind().dialect.name
+        native = dialect in ("sqlite", "postgresql", "mysql")
+        if native and await cls._has_unique_index(session):
+            # 原生 upsert 区分不了插入和更新，计数已缓存时先查出新增行数
+            new_rows = await cls._count_new_rows(session, list(merged))
+            await cls._native_upsert(session, dialect, list(merged.values()))
+            for date, n in new_rows.items():
+                counter_cache.incr(sign_date_key(date), n)
+        else:
+            for chunk in chunked(list(merged.values())):
+                await cls._chunk_upsert(session, chunk)
+        return len(merged)
+
+    @classmethod
+    async def _has_unique_index(cls, session: AsyncSession) -> bool:
+        """
+        (uid, date) 唯一索引是否已建立，原生 upsert 依赖该索引
+        迁移失败时索引可能不存在，此时改用分批查询后写入；检查结果在进程内缓存
+        """
+        global _UNIQUE_INDEX_READY
+        if _UNIQUE_INDEX_READY is not None:
+            return _UNIQUE_INDEX_READY
+
+        table = cls.__table__
+
+        def check(sync_session) -> bool:
+            indexes = sa_inspect(sync_session.connection()).get_indexes(table.name)
+            return any(
+                index["name"] == "ix_roversign_uid_date" and index["unique"]
+                for index in indexes
+            )
+
+        _UNIQUE_INDEX_READY = await session.run_sync(check)
+        if not _UNIQUE_INDEX_READY:
+            logger.warning(
+                "[RoverSign] 签到表缺少 (uid, date) 唯一索引，批量写入改为逐批查询"
+            )
+        return _UNIQUE_INDEX_READY
+
+    @classmethod
+    async def _count_new_rows(
+        cls: Type[T_RoverSign],
+        session: AsyncSession,
+        keys: List[Tuple[str, str]],
+    ) -> Dict[str, int]:
+        """统计 (uid, date) 中数据库尚不存在的行数（只统计计数已缓存的日期）"""
+        new_rows: Dict[str, int] = {}
+        for date in {date for _, date in keys}:
+            if not counter_cache.cached(sign_date_key(date)):
+                continue
+            uids = [uid for uid, d in keys if d == date]
+            existing = 0
+            for chunk in chunked(uids):
+                sql = (
+                    select(func.count())
+                    .select_from(cls)
+                    .where(col(cls.uid).in_(chunk))
+                    .where(cls.date == date)
+                )
+                existing += (await session.execute(sql)).scalar() or 0
+            new_rows[date] = len(uids) - existing
+        return new_rows
+
+    @classmethod
+    async def _native_upsert(
+        cls: Type[T_RoverSign],
+        session: AsyncSession,
+        dialect: str,
+        rover_sign_list: List[RoverSignData],
+    ):
+        """INSERT ... ON CONFLICT DO UPDATE / ON DUPLICATE KEY UPDATE"""
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == "mysql":
+            from sqlalchemy.dialects.mysql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+
+        # 只更新每行非空的字段，按更新字段分组执行
+        groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        for data in rover_sign_list:
+            fields = tuple(f for f in SIGN_FIELDS if getattr(data, f) is not None)
+            if data.pgr_uid:
+                fields += ("pgr_uid",)
+            row = {f: getattr(data, f) or 0 for f in SIGN_FIELDS}
+            row.update(uid=data.uid, date=data.date, pgr_uid=data.pgr_uid or "")
+            groups.setdefault(fields, []).append(row)
+
+        table = cls.__table__  # type: ignore
+        for fields, rows in groups.items():
+            sql = insert(table)
+            if dialect == "mysql":
+                sql = sql.on_duplicate_key_update(
+                    {f: sql.inserted[f] for f in fields} or {"uid": sql.inserted.uid}
+                )
+            elif fields:
+                sql = sql.on_conflict_do_update(
+                    index_elements=["uid", "date"],
+                    set_={f: sql.excluded[f] for f in fields},
+                )
+            else:
+                sql = sql.on_conflict_do_nothing(index_elements=["uid", "date"])
+            for chunk in chunked(rows):
+                await session.execute(sql, list(chunk))
+
+    @classmethod
+    async def _chunk_upsert(
+        cls: Type[T_RoverSign],
+        session: AsyncSession,
+        rover_sign_list: Sequence[RoverSignData],
+    ):
+        """先批量查询已有记录，再更新或插入"""
+        records: Dict[Tuple[str, str], T_RoverSign] = {}
+        for date in {data.date for data in rover_sign_list}:
+            uids = [data.uid for data in rover_sign_list if data.date == date]
+            sql = select(cls).where(col(cls.uid).in_(uids)).where(cls.date == date)
+            result = await session.execute(sql)
+            for record in result.scalars().all():
+                records[(record.uid, record.date)] = record
+
+        for data in rover_sign_list:
+            record = records.get((data.uid, data.date))  # type: ignore
+            if record:
+                data.apply_to(record)
+            else:
+                session.add(cls(**data.to_dict()))
+                counter_cache.incr(sign_date_key(data.date))  # type: ignore
+
     @classmethod
     @with_session
     async def get_sign_data(
@@ -289,9 +669,35 @@ class RoverSign(BaseIDModel, table=True):
         uid: str,
         date: Optional[str] = None,
     ) -> Optional[T_RoverSign]:
-        """根据UID和日期查询签到数据"""
+        """根据UID和日期查询签到数据，优先合并未落库的缓冲数据（返回的记录已脱离会话）"""
+        from .sign_buffer import sign_buffer
+
         date = date or get_today_date()
-        return await cls._find_sign_record(session, uid, date)
+        record = await cls._find_sign_record(session, uid, date)
+        return sign_buffer.overlay(cls, session, uid, date, record)
+
+    @classmethod
+    @with_session
+    async def get_sign_data_by_uids(
+        cls: Type[T_RoverSign],
+        session: AsyncSession,
+        uids: List[str],
+        date: Optional[str] = None,
+    ) -> Dict[str, T_RoverSign]:
+        """根据UID列表和日期批量查询签到数据"""
+        if not uids:
+            return {}
+        from .sign_buffer import sign_buffer
+
+        date = date or get_today_date()
+        sql = select(cls).where(col(cls.uid).in_(uids)).where(cls.date == date)
+        result = await session.execute(sql)
+        records = {data.uid: data for data in result.scalars().all()}
+        for uid in uids:
+            record = sign_buffer.overlay(cls, session, uid, date, records.get(uid))
+            if record is not None:
+                records[uid] = record
+        return records
 
     @classmethod
     @with_session
@@ -307,13 +713,126 @@ class RoverSign(BaseIDModel, table=True):
         return list(result.scalars().all())
 
     @classmethod
-    @with_lock
     @with_session
+    async def count_sign_data_by_date(
+        cls: Type[T_RoverSign],
+        session: AsyncSession,
+        date: Optional[str] = None,
+    ) -> int:
+        """统计某日的签到记录数"""
+        actual_date = date or get_today_date()
+        sql = select(func.count()).select_from(cls).where(cls.date == actual_date)
+        result = await session.execute(sql)
+        return result.scalar() or 0
+
+    @classmethod
     async def clear_sign_record(
+        cls: Type[T_RoverSign],
+        date: str,
+        chunk_size: int = PURGE_CHUNK_SIZE,
+    ) -> Tuple[int, float]:
+        """
+        清除 date 及之前的签到记录
+        按主键分批删除，每批独立提交并让出事件循环，返回删除条数和耗时
+        """
+        start = time.monotonic()
+        last_id = 0
+        removed = 0
+        while True:
+            last_id, count = await cls._purge_chunk(date, last_id, chunk_size)
+            removed += count
+            if count < chunk_size:
+                break
+            await asyncio.sleep(PURGE_PAUSE)
+
+        counter_cache.clear()
+        return removed, time.monotonic() - start
+
+    @classmethod
+    @with_session
+    async def _purge_chunk(
         cls: Type[T_RoverSign],
         session: AsyncSession,
         date: str,
+        last_id: int,
+        chunk_size: int,
+    ) -> Tuple[int, int]:
+        """删除一批记录，只删除历史日期的记录，不与当天的签到写入争用写锁"""
+        sql = (
+            select(cls.id)
+            .where(cls.date <= date)
+            .where(col(cls.id) > last_id)
+            .order_by(col(cls.id))
+            .limit(chunk_size)
+        )
+        ids = list((await session.execute(sql)).scalars().all())
+        if not ids:
+            return last_id, 0
+        await session.execute(delete(cls).where(col(cls.id).in_(ids)))
+        return ids[-1], len(ids)
+
+
+class RoverSignLease(SQLModel, table=True):
+    """
+    签到执行租约（多进程部署时防止同一账号被同时签到）
+    租约需要立即对其他进程可见，每次操作单独提交
+    """
+
+    __table_args__: Dict[str, Any] = {"extend_existing": True}
+    key: str = Field(primary_key=True, title="租约键")
+    owner: str = Field(default="", title="持有者")
+    expire_at: float = Field(default=0, title="过期时间")
+
+    @classmethod
+    @with_lock(lambda a: [a["key"]])
+    @with_session
+    async def acquire(
+        cls: Type[T_RoverSignLease],
+        session: AsyncSession,
+        key: str,
+        owner: str,
+        ttl: float,
+    ) -> bool:
+        """尝试获取租约，已被其他持有者占用且未过期时返回 False"""
+        now = time.time()
+        await session.execute(
+            delete(cls).where(col(cls.key) == key).where(col(cls.expire_at) < now)
+        )
+        record = await session.get(cls, key)
+        if record:
+            return record.owner == owner
+        session.add(cls(key=key, owner=owner, expire_at=now + ttl))
+        return True
+
+    @classmethod
+    @with_lock(lambda a: [a["key"]])
+    @with_session
+    async def renew(
+        cls: Type[T_RoverSignLease],
+        session: AsyncSession,
+        key: str,
+        owner: str,
+        ttl: float,
+    ) -> bool:
+        """续期租约，租约已不属于该持有者时返回 False"""
+        sql = (
+            update(cls)
+            .where(col(cls.key) == key)
+            .where(col(cls.owner) == owner)
+            .values(expire_at=time.time() + ttl)
+        )
+        result = await session.execute(sql)
+        return bool(result.rowcount)
+
+    @classmethod
+    @with_lock(lambda a: [a["key"]])
+    @with_session
+    async def release(
+        cls: Type[T_RoverSignLease],
+        session: AsyncSession,
+        key: str,
+        owner: str,
     ):
-        """清除签到记录"""
-        sql = delete(cls).where(getattr(cls, "date") <= date)
+        """释放租约"""
+        sql = delete(cls).where(col(cls.key) == key).where(col(cls.owner) == owner)
         await session.execute(sql)
@@ -0,0 +1,148 @@
+import asyncio
+from dataclasses import replace
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from gsuid_core.logger import logger
+
+from ..util import get_today_date
+from .models import RoverSign, RoverSignData
+
+
+class SignStateBuffer:
+    """签到状态写缓冲
+
+    签到过程中的状态先按 (uid, date) 合并在内存中，
+    每 flush_interval 秒或累计 max_rows 条时在一个事务中批量写入 RoverSign。
+    读取签到数据时优先合并缓冲中尚未落库的状态（包括正在写入的）。
+    写入失败时按指数退避重试，同一条状态连续失败 max_retries 次后丢弃并记录错误。
+    """
+
+    def __init__(
+        self,
+        flush_interval: float = 0.5,
+        max_rows: int = 200,
+        max_retries: int = 5,
+    ):
+        self.flush_interval = flush_interval
+        self.max_rows = max_rows
+        self.max_retries = max_retries
+        self._pending: Dict[Tuple[str, str], RoverSignData] = {}
+        # 正在写入数据库的状态
+        self._inflight: Dict[Tuple[str, str], RoverSignData] = {}
+        # (uid, date) -> 连续写入失败次数
+        self._failures: Dict[Tuple[str, str], int] = {}
+        self._flush_lock = asyncio.Lock()
+        self._timer: Optional[asyncio.Task] = None
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def put(self, data: Any):
+        """写入签到状态（RoverSignData 或 RoverSign 记录）"""
+        if not isinstance(data, RoverSignData):
+            data = RoverSignData.from_record(data)
+        if not data.uid:
+            return
+
+        date = data.date or get_today_date()
+        key = (data.uid, date)
+        if key in self._pending:
+            self._pending[key].merge(data)
+        else:
+            self._pending[key] = data.with_date(date)
+
+        if len(self._pending) >= self.max_rows:
+            self._flush_task = asyncio.create_task(self.flush())
+        else:
+            self._schedule()
+
+    def _schedule(self, delay: Optional[float] = None):
+        """安排一次定时写入，已有等待中的定时写入时不重复安排"""
+        timer = self._timer
+        # 在定时写入任务内部调用时，该任务即将结束，需要重新安排
+        if timer is None or timer.done() or timer is asyncio.current_task():
+            self._timer = asyncio.create_task(self._delayed_flush(delay))
+
+    def _lookup(self, key: Tuple[str, str]) -> Optional[RoverSignData]:
+        """尚未落库的状态，新写入的覆盖正在写入的"""
+        inflight = self._inflight.get(key)
+        pending = self._pending.get(key)
+        if inflight is None or pending is None:
+            return pending or inflight
+        data = replace(inflight)
+        data.merge(pending)
+        return data
+
+    def overlay(
+        self,
+        cls,
+        session: AsyncSession,
+        uid: str,
+        date: str,
+        record: Optional[RoverSign],
+    ):
+        """
+        将缓冲中的状态合并到查询结果上（不会写回数据库）
+        返回的记录总是脱离会话：调用方会在签到过程中修改它，修改不能被写回
+        """
+        if record is not None:
+            session.expunge(record)
+        pending = self._lookup((uid, date))
+        if pending is None:
+            return record
+        if record is None:
+            return cls(**pending.to_dict())
+        pending.apply_to(record)
+        return record
+
+    async def _delayed_flush(self, delay: Optional[float] = None):
+        await asyncio.sleep(self.flush_interval if delay is None else delay)
+        await self.flush()
+
+    async def flush(self) -> int:
+        """将缓冲中的状态写入数据库，返回写入条数"""
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+
+            pending, self._pending = self._pending, {}
+            self._inflight = pending
+            try:
+                await RoverSign.bulk_upsert(list(pending.values()))
+            except Exception as e:
+                logger.exception("[RoverSign] 签到状态写入失败，稍后重试", e)
+                dropped = []
+                retries = 0
+                for key, data in pending.items():
+                    failures = self._failures.get(key, 0) + 1
+                    if failures > self.max_retries:
+                        self._failures.pop(key, None)
+                        dropped.append(key)
+                        continue
+                    self._failures[key] = failures
+                    retries = max(retries, failures)
+                    # 放回缓冲，期间的新数据优先
+                    if key in self._pending:
+                        data.merge(self._pending[key])
+                    self._pending[key] = data
+                if dropped:
+                    logger.error(
+                        f"[RoverSign] 签到状态连续写入失败 {self.max_retries + 1} 次，"
+                        f"丢弃 {len(dropped)} 条: {dropped}"
+                    )
+                if self._pending:
+                    self._schedule(self.flush_interval * 2**retries)
+                return 0
+            finally:
+                self._inflight = {}
+
+            for key in pending:
+                self._failures.pop(key, None)
+            # 写入期间新加入的状态
+            if self._pending:
+                self._schedule()
+            logger.debug(f"[RoverSign] 签到状态写入 {len(pending)} 条")
+            return len(pending)
+
+
+sign_buffer = SignStateBuffer()
@@ -1,4 +1,6 @@
 ROVER_CODE_999 = -999
+# 社区任务部分完成
+ROVER_CODE_BBS_PARTIAL = -998
 
 WAVES_CODE_101_MSG = "请检查登录有效性"
 ROVER_CODE_999_MSG = "请求失败"
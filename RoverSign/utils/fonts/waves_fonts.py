@@ -1,37 +1,44 @@
+import re
+import threading
 from pathlib import Path
+from collections import OrderedDict
 
 from PIL import ImageFont
 
 FONT_ORIGIN_PATH = Path(__file__).parent / "arial-unicode-ms-bold.ttf"
 
+# 每个线程最多缓存的字号数量
+FONT_CACHE_SIZE = 8
+
+# FreeType 字体对象不能在线程间共用，渲染线程池中每个线程各自缓存
+_local = threading.local()
+
 
 def waves_font_origin(size: int) -> ImageFont.FreeTypeFont:
     return ImageFont.truetype(str(FONT_ORIGIN_PATH), size=size)
 
 
-waves_font_12 = waves_font_origin(12)
-waves_font_14 = waves_font_origin(14)
-waves_font_16 = waves_font_origin(16)
-waves_font_15 = waves_font_origin(15)
-waves_font_18 = waves_font_origin(18)
-waves_font_20 = waves_font_origin(20)
-waves_font_22 = waves_font_origin(22)
-waves_font_23 = waves_font_origin(23)
-waves_font_24 = waves_font_origin(24)
-waves_font_25 = waves_font_origin(25)
-waves_font_26 = waves_font_origin(26)
-waves_font_28 = waves_font_origin(28)
-waves_font_30 = waves_font_origin(30)
-waves_font_32 = waves_font_origin(32)
-waves_font_34 = waves_font_origin(34)
-waves_font_36 = waves_font_origin(36)
-waves_font_38 = waves_font_origin(38)
-waves_font_40 = waves_font_origin(40)
-waves_font_42 = waves_font_origin(42)
-waves_font_44 = waves_font_origin(44)
-waves_font_50 = waves_font_origin(50)
-waves_font_58 = waves_font_origin(58)
-waves_font_60 = waves_font_origin(60)
-waves_font_62 = waves_font_origin(62)
-waves_font_70 = waves_font_origin(70)
-waves_font_84 = waves_font_origin(84)
+def get_font(size: int) -> ImageFont.FreeTypeFont:
+    """按字号获取字体，首次使用时加载，超出缓存数量时淘汰最久未用的字号"""
+    cache: "OrderedDict[int, ImageFont.FreeTypeFont]"
+    if not hasattr(_local, "fonts"):
+        _local.fonts = OrderedDict()
+    cache = _local.fonts
+
+    font = cache.get(size)
+    if font is None:
+        font = waves_font_origin(size)
+        cache[size] = font
+        if len(cache) > FONT_CACHE_SIZE:
+            cache.popitem(last=False)
+    else:
+        cache.move_to_end(size)
+    return font
+
+
+def __getattr__(name: str) -> ImageFont.FreeTypeFont:
+    # 兼容 waves_font_24 等旧名称
+    match = re.fullmatch(r"waves_font_(\d+)", name)
+    if match:
+        return get_font(int(match.group(1)))
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,5 +1,7 @@
+import threading
 from pathlib import Path
-from typing import Literal
+from collections import OrderedDict
+from typing import Tuple, Literal, Callable, Hashable
 
 from PIL import Image, ImageOps
 
@@ -9,29 +11,117 @@ ICON = Path(__file__).parent.parent.parent / "ICON.png"
 TEXT_PATH = Path(__file__).parent / "texture2d"
 
 
+class TextureCache:
+    """贴图缓存
+
+    缓存解码后的素材以及裁剪、缩放、反色等派生结果，
+    按解码后占用的内存估算总量，超出 max_bytes 时淘汰最久未用的。
+    缓存中的图片不能被修改，需要绘制时先 copy。
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._images: "OrderedDict[Hashable, Image.Image]" = OrderedDict()
+        self._size = 0
+        # 渲染线程池中也会使用
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def image_bytes(img: Image.Image) -> int:
+        return img.width * img.height * len(img.getbands())
+
+    def get(
+        self, key: Hashable, loader: Callable[[], Image.Image]
+    ) -> Image.Image:
+        with self._lock:
+            img = self._images.get(key)
+            if img is not None:
+                self._images.move_to_end(key)
+                return img
+
+        img = loader()
+        img.load()
+        with self._lock:
+            if key not in self._images:
+                self._images[key] = img
+                self._size += self.image_bytes(img)
+            while self._size > self.max_bytes and len(self._images) > 1:
+                _, old = self._images.popitem(last=False)
+                self._size -= self.image_bytes(old)
+        return img
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+            self._size = 0
+
+
+texture_cache = TextureCache()
+
+
+def get_texture(path: Path, mode: str = "") -> Image.Image:
+    """解码后的素材（只读）"""
+
+    def load():
+        img = Image.open(path)
+        return img.convert(mode) if mode else img
+
+    return texture_cache.get(("texture", str(path), mode), load)
+
+
 def get_ICON():
-    return Image.open(ICON)
+    return get_texture(ICON).copy()
 
 
 def get_waves_bg(w: int, h: int, bg: str = "bg") -> Image.Image:
-    img = Image.open(TEXT_PATH / f"{bg}.jpg").convert("RGBA")
-    return crop_center_img(img, w, h)
+    def load():
+        img = get_texture(TEXT_PATH / f"{bg}.jpg", "RGBA")
+        return crop_center_img(img, w, h)
+
+    return texture_cache.get(("waves_bg", bg, w, h), load).copy()
 
 
 def get_crop_waves_bg(w: int, h: int, bg: str = "bg") -> Image.Image:
-    img = Image.open(TEXT_PATH / f"{bg}.jpg").convert("RGBA")
+    def load():
+        img = get_texture(TEXT_PATH / f"{bg}.jpg", "RGBA")
+
+        width, height = img.size
 
-    width, height = img.size
+        crop_box = (0, height // 2, width, height)
 
-    crop_box = (0, height // 2, width, height)
+        cropped_image = img.crop(crop_box)
 
-    cropped_image = img.crop(crop_box)
+        return crop_center_img(cropped_image, w, h)
 
-    return crop_center_img(cropped_image, w, h)
+    return texture_cache.get(("crop_waves_bg", bg, w, h), load).copy()
 
 
 def get_footer(color: Literal["white", "black", "hakush"] = "white"):
-    return Image.open(TEXT_PATH / f"footer_{color}.png")
+    return get_texture(TEXT_PATH / f"footer_{color}.png").copy()
+
+
+def _get_footer_variant(
+    color: str, is_invert: bool, w: int
+) -> Image.Image:
+    """反色、缩放后的页脚（只读）"""
+
+    def load():
+        footer = get_texture(TEXT_PATH / f"footer_{color}.png")
+        if is_invert:
+            r, g, b, a = footer.split()
+            rgb_image = Image.merge("RGB", (r, g, b))
+            rgb_image = ImageOps.invert(rgb_image.convert("RGB"))
+            r2, g2, b2 = rgb_image.split()
+            footer = Image.merge("RGBA", (r2, g2, b2, a))
+
+        if w != 0:
+            footer = footer.resize(
+                (w, int(footer.size[1] * w / footer.size[0])),
+            )
+        return footer
+
+    key: Tuple[str, str, bool, int] = ("footer", color, is_invert, w)
+    return texture_cache.get(key, load)
 
 
 def add_footer(
@@ -41,18 +131,7 @@ def add_footer(
     is_invert: bool = False,
     color: Literal["white", "black", "hakush"] = "white",
 ):
-    footer = get_footer(color)
-    if is_invert:
-        r, g, b, a = footer.split()
-        rgb_image = Image.merge("RGB", (r, g, b))
-        rgb_image = ImageOps.invert(rgb_image.convert("RGB"))
-        r2, g2, b2 = rgb_image.split()
-        footer = Image.merge("RGBA", (r2, g2, b2, a))
-
-    if w != 0:
-        footer = footer.resize(
-            (w, int(footer.size[1] * w / footer.size[0])),
-        )
+    footer = _get_footer_variant(color, is_invert, w)
 
     x, y = (
         int((img.size[0] - footer.size[0]) / 2),
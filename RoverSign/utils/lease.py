@@ -0,0 +1,98 @@
+import asyncio
+import hashlib
+import os
+import uuid
+from typing import Awaitable, Callable, TypeVar
+
+from gsuid_core.logger import logger
+
+from .single_flight import SingleFlight
+from .database.models import RoverSignLease
+
+T = TypeVar("T")
+
+# 当前进程的租约持有者标识
+LEASE_OWNER = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+
+def get_lease_backend() -> str:
+    from ..roversign_config.roversign_config import RoverSignConfig
+
+    return RoverSignConfig.get_config("SignLeaseBackend").data
+
+
+def cookie_key(cookie: str) -> str:
+    """cookie 不直接作为租约键保存"""
+    return hashlib.md5(cookie.encode()).hexdigest()[:16]
+
+
+class SignLease:
+    """签到执行租约
+
+    同一 key（uid 或 cookie）同一时间只执行一次签到，
+    并发的其他调用者直接等待并共享进行中的结果，不再发出自己的请求。
+    backend 为 database 时额外通过数据库租约在多进程间互斥：
+    执行期间每 ttl/3 秒续期一次；等待其他进程超过 ttl 时不再等待，
+    不持有租约直接执行（签到接口本身可重复调用）。
+    """
+
+    def __init__(self, ttl: float = 300, poll_interval: float = 1):
+        self.ttl = ttl
+        self.poll_interval = poll_interval
+        self._flight: SingleFlight = SingleFlight()
+
+    async def run(self, key: str, func: Callable[[], Awaitable[T]]) -> T:
+        if self._flight.running(key):
+            logger.debug(f"[RoverSign] [租约] {key} 正在执行，等待结果")
+        return await self._flight.run(
+            key, lambda: self._run_with_backend(key, func)
+        )
+
+    async def _run_with_backend(
+        self, key: str, func: Callable[[], Awaitable[T]]
+    ) -> T:
+        if get_lease_backend() != "database":
+            return await func()
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.ttl
+        while not await self._acquire(key):
+            if loop.time() >= deadline:
+                logger.warning(
+                    f"[RoverSign] [租约] {key} 等待超过 {self.ttl}s，不持有租约执行"
+                )
+                return await func()
+            await asyncio.sleep(self.poll_interval)
+
+        renew_task = asyncio.create_task(self._keep_alive(key))
+        try:
+            return await func()
+        finally:
+            renew_task.cancel()
+            await asyncio.gather(renew_task, return_exceptions=True)
+            await RoverSignLease.release(key, LEASE_OWNER)
+
+    async def _keep_alive(self, key: str):
+        """执行期间定期续期，避免长时间的签到被其他进程抢占"""
+        while True:
+            await asyncio.sleep(self.ttl / 3)
+            try:
+                renewed = await RoverSignLease.renew(key, LEASE_OWNER, self.ttl)
+            except Exception as e:
+                logger.debug(f"[RoverSign] [租约] {key} 续期失败: {e}")
+                continue
+            if not renewed:
+                logger.warning(f"[RoverSign] [租约] {key} 租约已失效")
+                return
+
+    async def _acquire(self, key: str) -> bool:
+        try:
+            return await RoverSignLease.acquire(key, LEASE_OWNER, self.ttl)
+        except Exception as e:
+            # 其他进程同时插入时主键冲突，视为未获取
+            logger.debug(f"[RoverSign] [租约] {key} 获取失败: {e}")
+            return False
+
+
+sign_lease = SignLease()
+
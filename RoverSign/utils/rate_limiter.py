@@ -0,0 +1,74 @@
+import asyncio
+import random
+import time
+from contextvars import ContextVar
+from contextlib import asynccontextmanager
+from typing import Tuple, Optional, AsyncIterator
+
+
+class RateLimiter:
+    """异步限速器
+
+    最多 concurrency 个任务同时进行；每个名额释放后
+    需间隔 interval 范围内的随机时长才能再次放行，
+    总吞吐随并发数增长，用于替代散落各处的 asyncio.sleep。
+    """
+
+    def __init__(self, concurrency: int, interval: Tuple[float, float]):
+        self.concurrency = max(concurrency, 1)
+        self.interval = interval
+        # 空闲名额及其可再次放行的时间
+        self._slots: "asyncio.Queue[float]" = asyncio.Queue()
+        for _ in range(self.concurrency):
+            self._slots.put_nowait(0.0)
+
+    async def acquire(self):
+        ready_time = await self._slots.get()
+        wait = ready_time - time.monotonic()
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except BaseException:
+                self._slots.put_nowait(ready_time)
+                raise
+
+    def release(self):
+        self._slots.put_nowait(time.monotonic() + random.uniform(*self.interval))
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *args):
+        self.release()
+
+
+# 当前上下文中接口请求使用的限速器，未设置时不限速
+_CURRENT_LIMITER: ContextVar[Optional[RateLimiter]] = ContextVar(
+    "rover_sign_limiter", default=None
+)
+
+
+@asynccontextmanager
+async def use_limiter(limiter: RateLimiter) -> AsyncIterator[RateLimiter]:
+    """期间（包括其中创建的任务）发出的接口请求都经过 limiter"""
+    token = _CURRENT_LIMITER.set(limiter)
+    try:
+        yield limiter
+    finally:
+        _CURRENT_LIMITER.reset(token)
+
+
+@asynccontextmanager
+async def request_slot() -> AsyncIterator[None]:
+    """为一次接口请求获取当前限速器的名额"""
+    limiter = _CURRENT_LIMITER.get()
+    if limiter is None:
+        yield
+        return
+    async with limiter:
+        yield
+
+
+# 用户主动签到共用的限速器，与自动签到各自独立
+interactive_limiter = RateLimiter(concurrency=4, interval=(0.3, 0.8))
@@ -0,0 +1,79 @@
+import time
+import asyncio
+from io import BytesIO
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Tuple, TypeVar, Callable
+
+from PIL import Image
+
+from gsuid_core.logger import logger
+
+T = TypeVar("T")
+
+
+def encode_image(img: Image.Image, fmt: str = "png", quality: int = 85) -> bytes:
+    """
+    编码图片（在渲染线程中执行）
+    fmt: png 原图 / png8 256色PNG / webp / jpeg
+    """
+    buffer = BytesIO()
+    if fmt == "png8":
+        img = img.convert("RGB").quantize(colors=256)
+        img.save(buffer, format="PNG", optimize=True)
+    elif fmt == "webp":
+        img.save(buffer, format="WEBP", quality=quality)
+    elif fmt == "jpeg":
+        img.convert("RGB").save(buffer, format="JPEG", quality=quality, optimize=True)
+    else:
+        img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class RenderPool:
+    """图片渲染线程池
+
+    PIL 绘图和编码在线程池中执行，不阻塞事件循环；
+    同时等待的渲染任务不超过 max_pending 个，超出时调用方排队等待。
+    每次渲染记录排队和执行耗时。
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 16):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(
+            max_workers, thread_name_prefix="RoverSignRender"
+        )
+        self._pending = asyncio.Semaphore(max_pending)
+        # 名称 -> (次数, 总执行耗时)
+        self.stats: Dict[str, Tuple[int, float]] = {}
+
+    async def run(self, name: str, func: Callable[..., T], *args: Any) -> T:
+        submit_time = time.perf_counter()
+        async with self._pending:
+            loop = asyncio.get_running_loop()
+            start_time, end_time, result = await loop.run_in_executor(
+                self._executor, partial(self._timed, func, *args)
+            )
+        cost = end_time - start_time
+        wait = start_time - submit_time
+
+        count, total = self.stats.get(name, (0, 0.0))
+        self.stats[name] = (count + 1, total + cost)
+        logger.debug(
+            f"[RoverSign] [渲染] {name} 排队 {wait * 1000:.1f}ms "
+            f"渲染 {cost * 1000:.1f}ms"
+        )
+        return result
+
+    @staticmethod
+    def _timed(func: Callable[..., T], *args: Any) -> Tuple[float, float, T]:
+        start_time = time.perf_counter()
+        result = func(*args)
+        return start_time, time.perf_counter(), result
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+render_pool = RenderPool()
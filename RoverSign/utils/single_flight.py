@@ -0,0 +1,46 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+def _consume_exception(future: asyncio.Future):
+    # 没有等待者时也要取走异常，避免未处理异常告警
+    if not future.cancelled():
+        future.exception()
+
+
+class SingleFlight(Generic[T]):
+    """合并并发调用
+
+    同一 key 同一时间只执行一次 func，
+    执行期间的其他调用者等待并共享同一个结果（或异常）。
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    def running(self, key: Hashable) -> bool:
+        return key in self._inflight
+
+    async def run(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_consume_exception)
+        self._inflight[key] = future
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
@@ -0,0 +1,78 @@
+"""
+签到数据批量写入基准
+
+对比逐条 upsert_rover_sign（每条一个会话、先查后写）与 bulk_upsert
+（一个事务内原生 upsert）的写入速度，使用内存 SQLite，不影响正式数据库。
+
+需要在安装了 gsuid_core 的环境中运行：
+    python benchmarks/bench_bulk_upsert.py [行数]
+"""
+
+import sys
+import time
+import asyncio
+import inspect
+from pathlib import Path
+
+from sqlmodel import SQLModel
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from RoverSign.utils.database.models import (  # noqa: E402
+    RoverSign,
+    RoverSignData,
+)
+
+DATE = "2025-01-01"
+
+
+def build_rows(n: int, offset: int = 0):
+    return [
+        RoverSignData.build_game_sign(str(100000000 + offset + i)).with_date(DATE)
+        for i in range(n)
+    ]
+
+
+async def bench_per_row(maker, rows) -> float:
+    upsert = inspect.unwrap(RoverSign._upsert.__func__)
+    start = time.perf_counter()
+    for row in rows:
+        async with maker() as session:
+            await upsert(RoverSign, session, row)
+            await session.commit()
+    return time.perf_counter() - start
+
+
+async def bench_bulk(maker, rows) -> float:
+    bulk_upsert = inspect.unwrap(RoverSign.bulk_upsert.__func__)
+    start = time.perf_counter()
+    async with maker() as session:
+        await bulk_upsert(RoverSign, session, rows)
+        await session.commit()
+    return time.perf_counter() - start
+
+
+async def main(n: int):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(
+            SQLModel.metadata.create_all, tables=[RoverSign.__table__]
+        )
+    maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    for name, bench, offset in (
+        ("逐条写入", bench_per_row, 0),
+        ("批量写入", bench_bulk, n),
+    ):
+        # 第一次为插入，第二次为同一批数据的更新
+        for phase in ("insert", "update"):
+            cost = await bench(maker, build_rows(n, offset))
+            print(f"{name} {phase}: {n} 行 {cost:.3f}s, {n / cost:.0f} 行/秒")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000))
@@ -0,0 +1,113 @@
+"""
+热点查询执行计划检查
+
+在内存 SQLite 中执行迁移，确认签到和用户的热点查询走索引，
+并对比建索引前后的查询耗时。
+
+需要在安装了 gsuid_core 的环境中运行：
+    python benchmarks/bench_query_plan.py [行数]
+"""
+
+import sys
+import time
+import asyncio
+from pathlib import Path
+
+from sqlmodel import SQLModel
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from RoverSign.utils.database.migrations import (  # noqa: E402
+    MIGRATIONS,
+    run_migrations,
+)
+from RoverSign.utils.database.models import (  # noqa: E402
+    RoverSign,
+    WavesUser,
+)
+
+DATE = "2025-01-01"
+
+HOT_QUERIES = {
+    "RoverSign (uid, date)": (
+        "SELECT * FROM RoverSign WHERE uid = :uid AND date = :date",
+        {"uid": "100000500", "date": DATE},
+    ),
+    "WavesUser (cookie, uid, game_id)": (
+        "SELECT * FROM WavesUser "
+        "WHERE cookie = :cookie AND uid = :uid AND game_id = 3",
+        {"cookie": "cookie500", "uid": "100000500"},
+    ),
+    "WavesUser (user_id, uid, bot_id)": (
+        "SELECT * FROM WavesUser "
+        "WHERE user_id = :user_id AND uid = :uid AND bot_id = 'onebot'",
+        {"user_id": "500", "uid": "100000500"},
+    ),
+    "WavesUser (cookie)": (
+        "SELECT * FROM WavesUser WHERE cookie = :cookie",
+        {"cookie": "cookie500"},
+    ),
+}
+
+
+async def fill(conn, n: int):
+    await conn.execute(
+        RoverSign.__table__.insert(),
+        [{"uid": str(100000000 + i), "date": DATE} for i in range(n)],
+    )
+    await conn.execute(
+        WavesUser.__table__.insert(),
+        [
+            {
+                "bot_id": "onebot",
+                "user_id": str(i),
+                "uid": str(100000000 + i),
+                "cookie": f"cookie{i}",
+                "game_id": 3,
+            }
+            for i in range(n)
+        ],
+    )
+
+
+async def check(conn, label: str, rounds: int = 200):
+    print(f"== {label}")
+    for name, (sql, params) in HOT_QUERIES.items():
+        plan = await conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params)
+        detail = " | ".join(row[-1] for row in plan)
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            await conn.execute(text(sql), params)
+        cost = (time.perf_counter() - start) / rounds * 1000
+
+        index = "INDEX" in detail
+        print(f"{name}: {cost:.3f}ms, 使用索引={index}\n    {detail}")
+
+
+async def main(n: int):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    tables = [RoverSign.__table__, WavesUser.__table__]
+
+    # 不带索引的旧表结构
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all, tables=tables)
+        for table in tables:
+            for index in table.indexes:
+                await conn.run_sync(index.drop)
+        await fill(conn, n)
+        await check(conn, "迁移前")
+
+    version = await run_migrations(engine)
+    assert version == MIGRATIONS[-1].version, version
+
+    async with engine.connect() as conn:
+        await check(conn, f"迁移后 (v{version})")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000))
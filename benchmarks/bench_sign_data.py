@@ -0,0 +1,84 @@
+"""
+签到状态对象基准
+
+模拟一万个账号的一次签到运行：每个账号创建游戏签到、社区签到状态并合并，
+对比原先的 pydantic 模型与现在的 slots dataclass 的耗时。
+
+需要在安装了 gsuid_core 的环境中运行：
+    python benchmarks/bench_sign_data.py [账号数]
+"""
+
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+from pydantic import BaseModel
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from RoverSign.utils.database.models import (  # noqa: E402
+    SIGN_FIELDS,
+    RoverSignData,
+)
+
+DATE = "2025-01-01"
+
+
+class PydanticSignData(BaseModel):
+    """原先的 pydantic 实现"""
+
+    uid: str
+    pgr_uid: Optional[str] = None
+    date: Optional[str] = None
+    game_sign: Optional[int] = None
+    pgr_game_sign: Optional[int] = None
+    bbs_sign: Optional[int] = None
+    bbs_detail: Optional[int] = None
+    bbs_like: Optional[int] = None
+    bbs_share: Optional[int] = None
+
+    def merge(self, other: "PydanticSignData"):
+        for field in SIGN_FIELDS:
+            value = getattr(other, field)
+            if value is not None:
+                setattr(self, field, value)
+        if other.pgr_uid:
+            self.pgr_uid = other.pgr_uid
+
+
+def run_pydantic(n: int):
+    for i in range(n):
+        uid = str(100000000 + i)
+        data = PydanticSignData(uid=uid, game_sign=1).model_copy(
+            update={"date": DATE}
+        )
+        data.merge(
+            PydanticSignData(
+                uid=uid, bbs_sign=0, bbs_detail=0, bbs_like=0, bbs_share=0
+            )
+        )
+        data.merge(PydanticSignData(uid=uid, pgr_game_sign=1))
+        data.model_dump(exclude_none=True)
+
+
+def run_dataclass(n: int):
+    for i in range(n):
+        uid = str(100000000 + i)
+        data = RoverSignData.build_game_sign(uid).with_date(DATE)
+        data.merge(RoverSignData.build_bbs_sign(uid))
+        data.merge(RoverSignData.build_pgr_game_sign(uid))
+        data.to_dict()
+
+
+def main(n: int):
+    for name, func in (("pydantic", run_pydantic), ("dataclass", run_dataclass)):
+        func(1000)  # 预热
+        start = time.perf_counter()
+        func(n)
+        cost = time.perf_counter() - start
+        print(f"{name}: {n} 个账号 {cost * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,70 @@
+"""
+签到调度用户查询基准
+
+对比 get_waves_all_user（完整 ORM 对象）与 get_sign_user_rows
+（只查询签到字段的轻量行）的耗时和内存峰值，使用内存 SQLite。
+
+需要在安装了 gsuid_core 的环境中运行：
+    python benchmarks/bench_user_rows.py [行数]
+"""
+
+import sys
+import time
+import asyncio
+import inspect
+import tracemalloc
+from pathlib import Path
+
+from sqlmodel import SQLModel
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from RoverSign.utils.database.models import WavesUser  # noqa: E402
+
+
+async def measure(maker, name: str, method):
+    func = inspect.unwrap(method.__func__)
+    async with maker() as session:
+        tracemalloc.start()
+        start = time.perf_counter()
+        rows = await func(WavesUser, session)
+        cost = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    print(
+        f"{name}: {len(rows)} 行 {cost * 1000:.1f}ms, "
+        f"内存峰值 {peak / 1024 / 1024:.2f}MB"
+    )
+
+
+async def main(n: int):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(
+            SQLModel.metadata.create_all, tables=[WavesUser.__table__]
+        )
+        await conn.execute(
+            WavesUser.__table__.insert(),
+            [
+                {
+                    "bot_id": "onebot",
+                    "user_id": str(i),
+                    "uid": str(100000000 + i),
+                    "cookie": f"cookie{i}" * 20,
+                    "game_id": 3,
+                    "sign_switch": "on",
+                }
+                for i in range(n)
+            ],
+        )
+    maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    await measure(maker, "ORM 对象", WavesUser.get_waves_all_user)
+    await measure(maker, "轻量行", WavesUser.get_sign_user_rows)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000))